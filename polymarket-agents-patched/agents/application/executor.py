@@ -2,47 +2,74 @@ import os
 import json
 import ast
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-import math
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from dataclasses import dataclass
 
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
+from openai import RateLimitError
 
 from agents.polymarket.gamma import GammaMarketClient as Gamma
 from agents.connectors.chroma import PolymarketRAG as Chroma
 from agents.utils.objects import SimpleEvent, SimpleMarket
 from agents.application.prompts import Prompter
 from agents.polymarket.polymarket import Polymarket
+from agents.utils.llm_cache import LLM_CACHE_ENABLED, CachedChatModel
+from agents.utils import compact, ratelimit
+from agents.utils.tokens import counter_for, model_spec, pack_chunks
+from agents.utils.trade_stream import MalformedTradeError, TradeParser, parse_trade
+
+
+@dataclass
+class Forecast:
+    market: Any  # (Document, score) from filter_markets
+    question: str
+    forecast: str  # superforecaster answer
+    trade: str  # one_best_trade answer
+    edge: Optional[float]  # forecast probability minus current price of outcome_index
+    seconds: float
+    outcome_index: Optional[int] = None  # outcome token to buy for that edge
+    # fields parsed from the trade while it streamed
+    price: Optional[float] = None
+    size: Optional[float] = None
+    side: Optional[str] = None
 
-def retain_keys(data, keys_to_retain):
-    if isinstance(data, dict):
-        return {
-            key: retain_keys(value, keys_to_retain)
-            for key, value in data.items()
-            if key in keys_to_retain
-        }
-    elif isinstance(data, list):
-        return [retain_keys(item, keys_to_retain) for item in data]
-    else:
-        return data
 
 class Executor:
-    def __init__(self, default_model='gpt-3.5-turbo-16k') -> None:
+    def __init__(self, default_model='gpt-3.5-turbo-16k', use_llm_cache: bool = True) -> None:
         load_dotenv()
-        max_token_model = {'gpt-3.5-turbo-16k':15000, 'gpt-4-1106-preview':95000}
-        self.token_limit = max_token_model.get(default_model)
-        self.prompter = Prompter()
+        # Prompt budgets come from the model registry (POLYAI_MODEL_REGISTRY)
+        self.token_limit = model_spec(default_model).prompt_tokens
+        self.token_counter = counter_for(default_model)
+        self.prompter = Prompter(model=default_model)
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
 
+        # Parallel LLM calls when a prompt has to be split into chunks
+        self.llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+        # Batch forecasting: how many filtered markets to forecast per run,
+        # how many at once, and when to stop waiting for the rest
+        self.forecast_top_k = int(os.getenv("FORECAST_TOP_K", "5"))
+        self.forecast_max_concurrency = int(os.getenv("FORECAST_MAX_CONCURRENCY", str(self.llm_max_concurrency)))
+        self.forecast_time_budget = float(os.getenv("FORECAST_TIME_BUDGET_SECONDS", "120"))
+
         # Risk controls (hard caps)
         self.max_portfolio_fraction_per_trade = float(os.getenv("MAX_PORTFOLIO_FRACTION_PER_TRADE", "0.02"))
         self.min_portfolio_fraction_per_trade = float(os.getenv("MIN_PORTFOLIO_FRACTION_PER_TRADE", "0.001"))
 
-        self.llm = ChatOpenAI(
-            model=default_model, #gpt-3.5-turbo"
-            temperature=0,
+        # temperature=0 completions are deterministic, so identical prompts are
+        # served from the local cache; pass bypass_cache=True to invoke to skip it
+        self.llm = CachedChatModel(
+            ChatOpenAI(
+                model=default_model, #gpt-3.5-turbo"
+                temperature=0,
+            ),
+            model=default_model,
+            enabled=LLM_CACHE_ENABLED and use_llm_cache,
         )
         self.gamma = Gamma()
         self.chroma = Chroma()
@@ -66,8 +93,8 @@ class Executor:
 
 
     def estimate_tokens(self, text: str) -> int:
-        # This is a rough estimate. For more accurate results, consider using a tokenizer.
-        return len(text) // 4  # Assuming average of 4 characters per token
+        # Exact with tiktoken; falls back to ~4 characters per token without it
+        return self.token_counter.count(text)
 
     def process_data_chunk(self, data1: List[Dict[Any, Any]], data2: List[Dict[Any, Any]], user_input: str) -> str:
         system_message = SystemMessage(
@@ -79,54 +106,77 @@ class Executor:
         return result.content
 
 
-    def divide_list(self, original_list, i):
-        # Calculate the size of each sublist
-        sublist_size = math.ceil(len(original_list) / i)
-        
-        # Use list comprehension to create sublists
-        return [original_list[j:j+sublist_size] for j in range(0, len(original_list), sublist_size)]
-    
     def get_polymarket_llm(self, user_input: str) -> str:
         data1 = self.gamma.get_current_events()
         data2 = self.gamma.get_current_markets()
-        
-        combined_data = str(self.prompter.prompts_polymarket(data1=data1, data2=data2))
-        
-        # Estimate total tokens
-        total_tokens = self.estimate_tokens(combined_data)
-        
-        # Set a token limit (adjust as needed, leaving room for system and user messages)
+
+        # Fixed cost of every chunk: prompt template, table headings and the user's question
+        template = str(self.prompter.prompts_polymarket(data1=[], data2=[]))
+        overhead = self.token_counter.count_messages(template, user_input)
+        overhead += self.token_counter.count(compact.heading(compact.EVENT_COLUMNS) + compact.heading(compact.MARKET_COLUMNS))
+
+        # Items are measured as the compact rows the prompt will contain;
+        # counts are cached, so unchanged markets are not re-tokenized
+        total_tokens = overhead + sum(
+            self.token_counter.count_item(compact.row(item)) for item in data1 + data2
+        )
+
         token_limit = self.token_limit
         if total_tokens <= token_limit:
             # If within limit, process normally
             return self.process_data_chunk(data1, data2, user_input)
         else:
-            # If exceeding limit, process in chunks
-            chunk_size = len(combined_data) // ((total_tokens // token_limit) + 1)
+            # If exceeding limit, pack events and markets into as few full chunks as fit
             print(f'total tokens {total_tokens} exceeding llm capacity, now will split and answer')
-            group_size = (total_tokens // token_limit) + 1 # 3 is safe factor
-            keys_no_meaning = ['image','pagerDutyNotificationEnabled','resolvedBy','endDate','clobTokenIds','negRiskMarketID','conditionId','updatedAt','startDate']
-            useful_keys = ['id','questionID','description','liquidity','clobTokenIds','outcomes','outcomePrices','volume','startDate','endDate','question','questionID','events']
-            data1 = retain_keys(data1, useful_keys)
-            cut_1 = self.divide_list(data1, group_size)
-            cut_2 = self.divide_list(data2, group_size)
-            cut_data_12 = zip(cut_1, cut_2)
-
-            results = []
-
-            for cut_data in cut_data_12:
-                sub_data1 = cut_data[0]
-                sub_data2 = cut_data[1]
-                sub_tokens = self.estimate_tokens(str(self.prompter.prompts_polymarket(data1=sub_data1, data2=sub_data2)))
-
-                result = self.process_data_chunk(sub_data1, sub_data2, user_input)
-                results.append(result)
-            
-            combined_result = " ".join(results)
-            
-        
-            
-            return combined_result
+            chunks = pack_chunks([data1, data2], token_limit - overhead, self.token_counter, render=compact.row)
+            print(f'packed {len(data1)} events and {len(data2)} markets into {len(chunks)} chunks of at most {token_limit} tokens')
+            return " ".join(self.process_data_chunks(chunks, user_input))
+
+    def _call_llm_rate_limited(self, label: str, fn, *args):
+        """
+        Run ``fn(*args)`` (which calls the LLM) inside the api.openai.com
+        limiter, retrying with backoff when the API throttles.
+        """
+        limiter = ratelimit.limiter_for("api.openai.com")
+        attempt = 0
+        while True:
+            with limiter:
+                start = time.monotonic()
+                try:
+                    result = fn(*args)
+                except RateLimitError:
+                    throttled = True
+                else:
+                    throttled = False
+                    limiter.on_success()
+            if not throttled:
+                print(f"{label}: {time.monotonic() - start:.2f}s")
+                return result
+            limiter.on_throttle()
+            if attempt >= ratelimit.MAX_RETRIES:
+                raise RuntimeError(f"{label} still rate limited after {attempt} retries")
+            time.sleep(ratelimit.backoff_delay(attempt))
+            attempt += 1
+
+    def process_data_chunks(self, chunks, user_input: str) -> "list[str]":
+        """
+        Answer every (events, markets) chunk concurrently, at most
+        ``llm_max_concurrency`` at a time, backing off when the API throttles.
+        Answers come back in chunk order.
+        """
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, self.llm_max_concurrency)) as pool:
+            results = list(
+                pool.map(
+                    lambda args: self._call_llm_rate_limited(
+                        f"chunk {args[0]}", self.process_data_chunk, args[1][0], args[1][1], user_input
+                    ),
+                    enumerate(chunks),
+                )
+            )
+        print(f"{len(chunks)} chunks answered in {time.monotonic() - start:.2f}s wall clock")
+        return results
+
     def filter_events(self, events: "list[SimpleEvent]") -> str:
         prompt = self.prompter.filter_events(events)
         result = self.llm.invoke(prompt)
@@ -142,15 +192,15 @@ class Executor:
     def map_filtered_events_to_markets(
         self, filtered_events: "list[SimpleEvent]"
     ) -> "list[SimpleMarket]":
-        markets = []
+        market_ids = []
         for e in filtered_events:
             data = json.loads(e[0].json())
-            market_ids = data["metadata"]["markets"].split(",")
-            for market_id in market_ids:
-                market_data = self.gamma.get_market(market_id)
-                formatted_market_data = self.polymarket.map_api_to_market(market_data)
-                markets.append(formatted_market_data)
-        return markets
+            market_ids.extend(data["metadata"]["markets"].split(","))
+        markets_by_id = self.gamma.get_markets_by_ids(market_ids)
+        return [
+            self.polymarket.map_api_to_market(market_data)
+            for market_data in markets_by_id.values()
+        ]
 
     def filter_markets(self, markets) -> "list[tuple]":
         prompt = self.prompter.filter_markets()
@@ -160,6 +210,14 @@ class Executor:
         return self.chroma.markets(markets, prompt)
 
     def source_best_trade(self, market_object) -> str:
+        return self.forecast_market(market_object, verbose=True).trade
+
+    def forecast_market(self, market_object, verbose: bool = False, deadline: Optional[float] = None) -> Forecast:
+        """
+        Superforecast one market, then ask for a trade given that forecast.
+        Neither LLM call is started once the monotonic ``deadline`` has passed.
+        """
+        start = time.monotonic()
         market_document = market_object[0].dict()
         market = market_document["metadata"]
         outcome_prices = ast.literal_eval(market["outcome_prices"])
@@ -167,43 +225,157 @@ class Executor:
         question = market["question"]
         description = market_document["page_content"]
 
+        self._check_deadline(deadline, question)
         prompt = self.prompter.superforecaster(question, description, outcomes)
-        print()
-        print("... prompting ... ", prompt)
-        print()
-        result = self.llm.invoke(prompt)
-        content = result.content
+        if verbose:
+            print()
+            print("... prompting ... ", prompt)
+            print()
+        result = self._call_llm_rate_limited(f"superforecast {question}", self.llm.invoke, prompt)
+        forecast = result.content
 
-        print("result: ", content)
-        print()
-        prompt = self.prompter.one_best_trade(content, outcomes, outcome_prices)
-        print("... prompting ... ", prompt)
-        print()
-        result = self.llm.invoke(prompt)
-        content = result.content
+        if verbose:
+            print("result: ", forecast)
+            print()
+        self._check_deadline(deadline, question)
+        prompt = self.prompter.one_best_trade(forecast, outcomes, outcome_prices)
+        if verbose:
+            print("... prompting ... ", prompt)
+            print()
+        trade = self._call_llm_rate_limited(f"trade {question}", self.stream_trade, prompt)
+        content = trade.text
 
-        print("result: ", content)
-        print()
-        return content
+        if verbose:
+            print("result: ", content)
+            print()
+        edge, outcome_index = self.forecast_edge(forecast, outcomes, outcome_prices)
+        return Forecast(
+            market=market_object,
+            question=question,
+            forecast=forecast,
+            trade=content,
+            edge=edge,
+            seconds=time.monotonic() - start,
+            outcome_index=outcome_index,
+            price=trade.price,
+            size=trade.size,
+            side=trade.side,
+        )
 
-    def format_trade_prompt_for_execution(self, best_trade: str) -> float:
+    def _check_deadline(self, deadline: Optional[float], question: str) -> None:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"forecast time budget spent, dropping {question}")
+
+    def stream_trade(self, prompt: str) -> TradeParser:
+        """
+        Stream the one_best_trade answer into a TradeParser and stop
+        generation as soon as price, size and side are parsed; the answer up
+        to that point is what gets cached. Raises MalformedTradeError as soon
+        as the answer cannot be well formed.
+        """
+        start = time.monotonic()
+        parser = TradeParser()
+        for _ in self.llm.stream(prompt, until=parser.feed):
+            pass
+        if parser.complete:
+            print(f"trade parsed after {time.monotonic() - start:.2f}s")
+        return parser.finish()
+
+    def forecast_edge(self, forecast: str, outcomes, outcome_prices) -> "tuple[Optional[float], Optional[int]]":
+        """
+        Expected edge of buying an outcome token: the probability stated in a
+        superforecaster answer minus that outcome's current price. The answer
+        names one outcome (the first is assumed if none is named); in a binary
+        market the other outcome gets the complement, so an overpriced outcome
+        shows up as a positive edge on its opposite. Returns the larger edge
+        and the index of the outcome token to buy for it.
+        """
+        match = re.search(r"likelihood\W*(\d*\.?\d+)\s*(%?)", forecast or "")
+        if not match:
+            return None, None
+        likelihood = float(match.group(1))
+        if match.group(2) or likelihood > 1:
+            likelihood /= 100
+        index = 0
+        for i, outcome in enumerate(outcomes):
+            if re.search(rf"outcome of\W*{re.escape(str(outcome))}\b", forecast, re.IGNORECASE):
+                index = i
+                break
+        edges = {index: likelihood - float(outcome_prices[index])}
+        if len(outcomes) == 2:
+            edges[1 - index] = (1 - likelihood) - float(outcome_prices[1 - index])
+        best = max(edges, key=edges.get)
+        return round(edges[best], 4), best
+
+    def source_best_trades(
+        self,
+        market_objects,
+        top_k: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> "list[Forecast]":
+        """
+        Forecast the first ``top_k`` markets concurrently and return the
+        finished forecasts, largest edge first. Forecasts still
+        running when ``time_budget`` seconds have passed are abandoned and
+        make no further LLM calls.
+        """
+        top_k = top_k or self.forecast_top_k
+        max_workers = max_workers or self.forecast_max_concurrency
+        time_budget = time_budget if time_budget is not None else self.forecast_time_budget
+        candidates = list(market_objects)[:top_k]
+
+        start = time.monotonic()
+        deadline = start + time_budget
+        forecasts = []
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        futures = {
+            pool.submit(self.forecast_market, market, deadline=deadline): i
+            for i, market in enumerate(candidates)
+        }
+        try:
+            for future in as_completed(futures, timeout=time_budget):
+                try:
+                    forecast = future.result()
+                except Exception as e:
+                    print(f"[warn] forecast {futures[future]} failed: {e}")
+                    continue
+                print(f"forecast {futures[future]}: edge {forecast.edge} for {forecast.question}")
+                forecasts.append(forecast)
+        except TimeoutError:
+            print(f"[warn] forecast time budget of {time_budget}s spent, using {len(forecasts)} of {len(candidates)} forecasts")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        print(f"{len(forecasts)} forecasts in {time.monotonic() - start:.2f}s wall clock")
+
+        forecasts.sort(key=lambda f: f.edge if f.edge is not None else float("-inf"), reverse=True)
+        return forecasts
+
+    def format_trade_prompt_for_execution(self, best_trade: str, size_fraction: Optional[float] = None) -> float:
         """
         Parse LLM trade output safely and apply hard risk caps.
         Expected size is a portfolio fraction (e.g. 0.01 = 1%).
+        Pass ``size_fraction`` when the size was already parsed (see stream_trade).
         """
-        matches = re.findall(r"\d*\.?\d+", best_trade or "")
-        if not matches:
-            raise ValueError(f"Could not parse trade size from LLM output: {best_trade}")
-
-        # Heuristic: use first value in [0,1] as fraction, else fallback to first parsed number
-        candidate_sizes = [float(x) for x in matches]
-        size_fraction = None
-        for c in candidate_sizes:
-            if 0 < c <= 1:
-                size_fraction = c
-                break
         if size_fraction is None:
-            size_fraction = candidate_sizes[0]
+            try:
+                size_fraction = parse_trade(best_trade).size
+            except MalformedTradeError:
+                pass
+
+        if size_fraction is None:
+            matches = re.findall(r"\d*\.?\d+", best_trade or "")
+            if not matches:
+                raise ValueError(f"Could not parse trade size from LLM output: {best_trade}")
+
+            # Heuristic: use first value in [0,1] as fraction, else fallback to first parsed number
+            candidate_sizes = [float(x) for x in matches]
+            for c in candidate_sizes:
+                if 0 < c <= 1:
+                    size_fraction = c
+                    break
+            if size_fraction is None:
+                size_fraction = candidate_sizes[0]
 
         # Clamp to configured risk limits
         size_fraction = max(self.min_portfolio_fraction_per_trade, size_fraction)
@@ -1,9 +1,48 @@
+import os
+import threading
 from typing import List
 from datetime import datetime
 
+from agents.utils import compact
+from agents.utils.tokens import counter_for
+
+# Count and print the tokens compact rendering saves on every prompt build.
+# Off by default: it tokenizes the raw str() dump as well as the prompt.
+REPORT_TOKEN_SAVINGS = os.getenv("POLYAI_REPORT_TOKEN_SAVINGS", "0") == "1"
+
 
 class Prompter:
 
+    def __init__(
+        self, model: str = "gpt-3.5-turbo-16k", report: bool = REPORT_TOKEN_SAVINGS
+    ) -> None:
+        # Market data is rendered with agents.utils.compact; with ``report``
+        # on, the counter measures how many tokens that saves over str() dumps
+        self.report = report
+        self.counter = counter_for(model) if report else None
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def report_savings(self, name: str, raw: str, rendered: str) -> int:
+        if not self.report:
+            return 0
+        raw_tokens = self.counter.count(raw)
+        rendered_tokens = self.counter.count(rendered)
+        saved = raw_tokens - rendered_tokens
+        # chunks of one prompt are built concurrently
+        with self._lock:
+            self.tokens_saved += saved
+        print(f"{name}: {raw_tokens} -> {rendered_tokens} tokens ({saved} saved)")
+        return saved
+
+    def compact_data(self, name: str, *datasets) -> "list[str]":
+        tables = [compact.table(data) for data in datasets]
+        if self.report and any(datasets):
+            self.report_savings(
+                name, " ".join(str(d) for d in datasets), " ".join(tables)
+            )
+        return tables
+
     def generate_simple_ai_trader(market_description: str, relevant_info: str) -> str:
         return f"""
             
@@ -36,14 +75,17 @@ class Prompter:
     def prompts_polymarket(
         self, data1: str, data2: str, market_question: str, outcome: str
     ) -> str:
-        current_market_data = str(data1)
-        current_event_data = str(data2)
+        current_market_data, current_event_data = self.compact_data(
+            "prompts_polymarket", data1, data2
+        )
         return f"""
         You are an AI assistant for users of a prediction market called Polymarket.
         Users want to place bets based on their beliefs of market outcomes such as political or sports events.
         
-        Here is data for current Polymarket markets {current_market_data} and 
-        current Polymarket events {current_event_data}.
+        Here is data for current Polymarket markets and events:
+        {current_market_data}
+
+        {current_event_data}
 
         Help users identify markets to trade based on their interests or queries.
         Provide specific information for markets including probabilities of outcomes.
@@ -53,14 +95,17 @@ class Prompter:
         """
 
     def prompts_polymarket(self, data1: str, data2: str) -> str:
-        current_market_data = str(data1)
-        current_event_data = str(data2)
+        current_market_data, current_event_data = self.compact_data(
+            "prompts_polymarket", data1, data2
+        )
         return f"""
         You are an AI assistant for users of a prediction market called Polymarket.
         Users want to place bets based on their beliefs of market outcomes such as political or sports events.
 
-        Here is data for current Polymarket markets {current_market_data} and 
-        current Polymarket events {current_event_data}.
+        Here is data for current Polymarket markets and events:
+        {current_market_data}
+
+        {current_event_data}
         Help users identify markets to trade based on their interests or queries.
         Provide specific information for markets including probabilities of outcomes.
         """
@@ -149,6 +194,10 @@ class Prompter:
         outcomes: List[str],
         outcome_prices: str,
     ) -> str:
+        quotes = compact.outcome_quotes(outcomes, outcome_prices)
+        self.report_savings(
+            "one_best_trade", f"${outcomes} prices are: ${outcome_prices}", quotes
+        )
         return (
             self.polymarket_analyst_api()
             + f"""
@@ -165,7 +214,7 @@ class Prompter:
         
         You made the following prediction for a market: {prediction}
 
-        The current outcomes ${outcomes} prices are: ${outcome_prices}
+        The current outcome prices are: {quotes}
 
         Given your prediction, respond with a genius trade in the format:
         `
@@ -224,8 +273,9 @@ class Prompter:
         """
 
     def create_new_market(self, filtered_markets: str) -> str:
+        (markets,) = self.compact_data("create_new_market", filtered_markets)
         return f"""
-        {filtered_markets}
+        {markets}
         
         Invent an information market similar to these markets that ends in the future,
         at least 6 months after today, which is: {datetime.today().strftime('%Y-%m-%d')},
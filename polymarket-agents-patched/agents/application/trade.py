@@ -1,7 +1,9 @@
 from agents.application.executor import Executor as Agent
 from agents.polymarket.gamma import GammaMarketClient as Gamma
+from agents.polymarket.paper import PaperTrader
 from agents.polymarket.polymarket import Polymarket
 
+import os
 import shutil
 import time
 
@@ -11,6 +13,10 @@ class Trader:
         self.polymarket = Polymarket()
         self.gamma = Gamma()
         self.agent = Agent()
+        # simulate fills against live order books instead of trading
+        self.paper = None
+        if os.getenv("POLYAI_PAPER_TRADING", "0") == "1":
+            self.paper = PaperTrader(self.polymarket.get_orderbook)
 
     def pre_trade_logic(self) -> None:
         self.clear_local_dbs()
@@ -55,15 +61,30 @@ class Trader:
                     print("[info] No markets passed filters. Skipping trade.")
                     return
 
-                market = filtered_markets[0]
-                best_trade = self.agent.source_best_trade(market)
-                print(f"5. CALCULATED TRADE {best_trade}")
+                forecasts = self.agent.source_best_trades(filtered_markets)
+                if not forecasts:
+                    # failures and the time budget are logged by source_best_trades;
+                    # rerunning the whole pipeline would hit the same budget
+                    print("[info] No forecast finished (all failed or the time budget ran out). Skipping trade.")
+                    return
+                best = forecasts[0]
+                if best.edge is None or best.edge <= 0:
+                    print(f"[info] No forecast shows a positive edge (best {best.edge}). Skipping trade.")
+                    return
+                market = best.market
+                best_trade = best.trade
+                print(f"5. CALCULATED TRADE {best_trade} (edge {best.edge} buying outcome {best.outcome_index} of {best.question}, best of {len(forecasts)})")
 
-                amount = self.agent.format_trade_prompt_for_execution(best_trade)
+                amount = self.agent.format_trade_prompt_for_execution(best_trade, best.size)
                 print(f"6. SAFE-SIZED AMOUNT {amount}")
 
+                if self.paper is not None:
+                    trade = self.paper.execute_market_order(market, amount, best.outcome_index)
+                    print(f"7. PAPER TRADED {trade}")
+                    return
+
                 # Please refer to TOS before uncommenting: polymarket.com/tos
-                # trade = self.polymarket.execute_market_order(market, amount)
+                # trade = self.polymarket.execute_market_order(market, amount, best.outcome_index)
                 # print(f"7. TRADED {trade}")
                 return
 
@@ -30,15 +30,20 @@ class PolymarketRAG:
         )
 
     def create_local_markets_rag(self, local_directory="./local_db") -> None:
-        all_markets = self.gamma_client.get_all_current_markets()
-
         if not os.path.isdir(local_directory):
             os.mkdir(local_directory)
 
         local_file_path = f"{local_directory}/all-current-markets_{time.time()}.json"
 
+        # Stream projected markets straight to disk instead of holding the
+        # full raw universe in memory.
         with open(local_file_path, "w+") as output_file:
-            json.dump(all_markets, output_file)
+            output_file.write("[")
+            for i, market in enumerate(self.gamma_client.iter_all_current_markets()):
+                if i:
+                    output_file.write(",")
+                json.dump(market, output_file)
+            output_file.write("]")
 
         self.load_json_from_local(
             json_file_path=local_file_path, vector_db_directory=local_directory
@@ -4,6 +4,7 @@ import os
 from newsapi import NewsApiClient
 
 from agents.utils.objects import Article
+from agents.utils import transport
 
 
 class News:
@@ -25,7 +26,9 @@ class News:
             "technology",
         }
 
-        self.API = NewsApiClient(os.getenv("NEWSAPI_API_KEY"))
+        self.API = NewsApiClient(
+            os.getenv("NEWSAPI_API_KEY"), session=transport.get_requests_session()
+        )
 
     def get_articles_for_cli_keywords(self, keywords) -> "list[Article]":
         query_words = keywords.split(",")
@@ -35,6 +35,18 @@ def add_trade(trade: Dict, path: str = STATE_PATH) -> None:
     save_state(state, path)
 
 
+def add_trades(trades: List[Dict], path: str = STATE_PATH) -> None:
+    """Append many trades with a single journal read/write."""
+    state = load_state(path)
+    state.setdefault("trades", [])
+    created_at = datetime.utcnow().isoformat() + "Z"
+    for trade in trades:
+        trade.setdefault("created_at", created_at)
+        trade.setdefault("status", "OPEN")
+        state["trades"].append(trade)
+    save_state(state, path)
+
+
 def open_trades(path: str = STATE_PATH) -> List[Dict]:
     return [t for t in load_state(path).get("trades", []) if t.get("status") == "OPEN"]
 
@@ -1,7 +1,8 @@
 import os
-import requests
 from datetime import datetime
 
+from agents.utils import transport
+
 
 class TelegramNotifier:
     def __init__(self) -> None:
@@ -21,7 +22,7 @@ class TelegramNotifier:
             "disable_web_page_preview": True,
         }
         try:
-            resp = requests.post(url, json=payload, timeout=20)
+            resp = transport.post(url, json=payload)
             return resp.status_code == 200
         except Exception:
             return False
@@ -0,0 +1,78 @@
+"""
+Bulk per-token lookups against the CLOB.
+
+``bulk_fetch`` asks a batch endpoint for each chunk of keys and then falls
+back to a bounded thread-pool fan-out of single lookups. The fan-out covers
+keys the batch call omitted, and whole chunks whose batch call failed.
+Failures are collected per key instead of aborting the whole lookup.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+
+class BulkResult(BaseModel):
+    values: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def aligned(self, keys: "Iterable[str]") -> List[Any]:
+        """Values in the order of ``keys``, with None for failed keys."""
+        return [self.values.get(str(key)) for key in keys]
+
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def bulk_fetch(
+    keys: "Iterable[str]",
+    fetch_batch: Optional[Callable[["list[str]"], "Dict[str, Any]"]],
+    fetch_one: Callable[[str], Any],
+    batch_size: int = 100,
+    max_workers: int = 8,
+) -> BulkResult:
+    unique_keys = list(dict.fromkeys(str(key) for key in keys))
+    result = BulkResult()
+    missing: List[str] = []
+
+    if fetch_batch is None:
+        missing = unique_keys
+    else:
+        for i in range(0, len(unique_keys), batch_size):
+            chunk = unique_keys[i : i + batch_size]
+            try:
+                values = fetch_batch(chunk)
+            except Exception as e:
+                print(f"[bulk_fetch] batch of {len(chunk)} failed, fanning out: {e}")
+                values = {}
+            for key in chunk:
+                if values.get(key) is not None:
+                    result.values[key] = values[key]
+                else:
+                    missing.append(key)
+
+    if missing:
+
+        def fetch(key: str):
+            try:
+                return key, fetch_one(key), None
+            except Exception as e:
+                return key, None, f"{type(e).__name__}: {e}"
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for key, value, error in pool.map(fetch, missing):
+                if error is None:
+                    result.values[key] = value
+                else:
+                    result.errors[key] = error
+
+    # keep values in input order
+    result.values = {k: result.values[k] for k in unique_keys if k in result.values}
+    return result
@@ -0,0 +1,283 @@
+"""
+Concurrent order submission.
+
+``OrderEngine`` signs every ticket concurrently and posts the signed orders
+through the CLOB's batch ``/orders`` endpoint, with independent batches in
+flight at once. Submitting N orders therefore costs about one signing pass
+plus one post round-trip, not N of each. Cancels in a cancel/replace run
+alongside the signing of their replacements; if the cancel fails, no
+replacement is posted and every ticket records why.
+
+Journal writes and Telegram notifications go to a single background worker,
+so they never delay the next order. Each ticket records its own sign/post
+latency.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from py_clob_client.clob_types import (
+    MarketOrderArgs,
+    OrderArgs,
+    OrderType,
+    RequestArgs,
+)
+from py_clob_client.exceptions import PolyApiException
+from py_clob_client.headers.headers import create_level_2_headers
+from py_clob_client.http_helpers.helpers import post
+from py_clob_client.utilities import order_to_json
+
+from agents.notifications.state import add_trade
+
+POST_ORDERS = "/orders"
+# the CLOB accepts at most this many orders per batch post
+MAX_BATCH_SIZE = 15
+
+
+@dataclass
+class OrderTicket:
+    token_id: str
+    side: str = "BUY"
+    price: Optional[float] = None  # limit orders
+    size: Optional[float] = None  # limit orders, in shares
+    amount: Optional[float] = None  # market orders, in USDC
+    order_type: str = OrderType.GTC
+    market_question: str = "Unknown Market"
+    journal: bool = False  # record in the trade journal and notify on success
+
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    signed_order: Any = None
+    response: Any = None
+    error: Optional[str] = None
+    queued_at: Optional[float] = None
+    signed_at: Optional[float] = None
+    posted_at: Optional[float] = None
+
+    @property
+    def is_market(self) -> bool:
+        return self.amount is not None
+
+    def latency_ms(self) -> dict:
+        def span(start, end):
+            if start is None or end is None:
+                return None
+            return (end - start) * 1000
+
+        return {
+            "sign": span(self.queued_at, self.signed_at),
+            "post": span(self.signed_at, self.posted_at),
+            "total": span(self.queued_at, self.posted_at),
+        }
+
+
+class OrderEngine:
+    def __init__(
+        self,
+        client,
+        notifier=None,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_workers: int = 8,
+        on_unauthorized=None,
+    ) -> None:
+        self.client = client
+        self.notifier = notifier
+        # called to replace the client's API creds after a 401
+        self.on_unauthorized = on_unauthorized
+        self._reauth_lock = threading.Lock()
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.batch_supported = True
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="order-engine"
+        )
+        # one worker keeps journal read-modify-writes ordered
+        self._side_effects = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="order-side-effects"
+        )
+        # runs submit() for callers that are already inside an event loop
+        self._runner = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="order-submit"
+        )
+
+    def _sign(self, ticket: OrderTicket) -> OrderTicket:
+        try:
+            if ticket.is_market:
+                ticket.signed_order = self.client.create_market_order(
+                    MarketOrderArgs(token_id=ticket.token_id, amount=ticket.amount)
+                )
+            else:
+                ticket.signed_order = self.client.create_order(
+                    OrderArgs(
+                        token_id=ticket.token_id,
+                        price=ticket.price,
+                        size=ticket.size,
+                        side=ticket.side,
+                    )
+                )
+        except Exception as e:
+            ticket.error = f"sign failed: {e}"
+        ticket.signed_at = time.monotonic()
+        return ticket
+
+    def _with_reauth(self, fn, *args):
+        """Run an authenticated CLOB call, re-deriving rejected creds once."""
+        creds = self.client.creds
+        try:
+            return fn(*args)
+        except PolyApiException as e:
+            if e.status_code != 401 or self.on_unauthorized is None:
+                raise
+            with self._reauth_lock:
+                # concurrent posts that hit the same 401 refresh only once
+                if self.client.creds is creds:
+                    print("CLOB rejected the API creds, re-deriving them")
+                    self.on_unauthorized()
+            return fn(*args)
+
+    def _post_orders(self, tickets: "list[OrderTicket]"):
+        body = [
+            order_to_json(t.signed_order, self.client.creds.api_key, t.order_type)
+            for t in tickets
+        ]
+        headers = create_level_2_headers(
+            self.client.signer,
+            self.client.creds,
+            RequestArgs(method="POST", request_path=POST_ORDERS, body=body),
+        )
+        return post(f"{self.client.host}{POST_ORDERS}", headers=headers, data=body)
+
+    def _post_batch(self, tickets: "list[OrderTicket]") -> None:
+        if self.batch_supported and len(tickets) > 1:
+            try:
+                responses = self._with_reauth(self._post_orders, tickets)
+            except PolyApiException as e:
+                if e.status_code not in (404, 405):
+                    self._fail(tickets, e)
+                    return
+                # this CLOB has no batch endpoint: post one by one from now on
+                self.batch_supported = False
+            else:
+                now = time.monotonic()
+                if not isinstance(responses, list) or len(responses) != len(tickets):
+                    self._fail(tickets, f"unexpected batch response: {responses}")
+                    return
+                for ticket, response in zip(tickets, responses):
+                    self._accept(ticket, response)
+                    ticket.posted_at = now
+                return
+        for ticket in tickets:
+            try:
+                response = self._with_reauth(
+                    self.client.post_order, ticket.signed_order, ticket.order_type
+                )
+            except Exception as e:
+                ticket.error = f"post failed: {e}"
+            else:
+                self._accept(ticket, response)
+            ticket.posted_at = time.monotonic()
+
+    def _accept(self, ticket: OrderTicket, response) -> None:
+        """Attach a CLOB order response, flagging orders the CLOB rejected."""
+        ticket.response = response
+        if isinstance(response, dict) and (
+            response.get("success") is False or response.get("errorMsg")
+        ):
+            ticket.error = f"rejected: {response.get('errorMsg') or response}"
+
+    def _fail(self, tickets: "list[OrderTicket]", error) -> None:
+        now = time.monotonic()
+        for ticket in tickets:
+            ticket.error = f"post failed: {error}"
+            ticket.posted_at = now
+
+    def _record(self, ticket: OrderTicket) -> None:
+        add_trade(
+            {
+                "id": ticket.id,
+                "market_question": ticket.market_question,
+                "token_id": ticket.token_id,
+                "amount_usdc": float(ticket.amount or 0.0),
+                "raw_response": str(ticket.response),
+            }
+        )
+        if self.notifier is not None:
+            self.notifier.send(
+                self.notifier.fmt_trade_taken(
+                    ticket.market_question, ticket.token_id, float(ticket.amount or 0.0)
+                )
+            )
+
+    async def submit_async(
+        self, tickets: "list[OrderTicket]", cancel_order_ids: "list[str]" = ()
+    ) -> "list[OrderTicket]":
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        for ticket in tickets:
+            ticket.queued_at = now
+
+        cancel = None
+        if cancel_order_ids:
+            cancel = loop.run_in_executor(
+                self._pool,
+                self._with_reauth,
+                self.client.cancel_orders,
+                list(cancel_order_ids),
+            )
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, self._sign, t) for t in tickets)
+        )
+        if cancel is not None:
+            # replacements must not rest alongside the quotes they replace,
+            # so none is posted unless the cancel went through
+            try:
+                await cancel
+            except Exception as e:
+                for ticket in tickets:
+                    if ticket.error is None:
+                        ticket.error = f"cancel failed, not posted: {e}"
+                return tickets
+
+        signed = [t for t in tickets if t.error is None]
+        batches = [
+            signed[i : i + self.batch_size]
+            for i in range(0, len(signed), self.batch_size)
+        ]
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, self._post_batch, b) for b in batches)
+        )
+
+        for ticket in tickets:
+            if ticket.journal and ticket.error is None:
+                self._side_effects.submit(self._record, ticket)
+        return tickets
+
+    def submit(
+        self, tickets: "list[OrderTicket]", cancel_order_ids: "list[str]" = ()
+    ) -> "list[OrderTicket]":
+        """
+        Blocking wrapper around ``submit_async`` for synchronous callers.
+        Called from inside a running event loop (e.g. a bot handler), it runs
+        the submission on a worker thread with its own loop; coroutines
+        should await ``submit_async`` instead so the loop is not blocked.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.submit_async(tickets, cancel_order_ids))
+        return self._runner.submit(
+            asyncio.run, self.submit_async(tickets, cancel_order_ids)
+        ).result()
+
+    def flush(self) -> None:
+        """Wait for pending journal writes and notifications."""
+        self._side_effects.submit(lambda: None).result()
+
+    def close(self) -> None:
+        """Flush side effects and release the worker threads."""
+        self._runner.shutdown(wait=True)
+        self._pool.shutdown(wait=True)
+        self._side_effects.shutdown(wait=True)
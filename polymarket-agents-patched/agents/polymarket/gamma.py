@@ -1,8 +1,60 @@
-import httpx
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
 
-from agents.polymarket.polymarket import Polymarket
-from agents.utils.objects import Market, PolymarketEvent, ClobReward, Tag
+from pydantic import TypeAdapter, ValidationError
+
+from agents.utils import transport
+from agents.utils.http_cache import get_response_cache
+from agents.utils.objects import Market, MarketRecord, PolymarketEvent, ClobReward, Tag
+from agents.utils.utils import iter_json_array
+
+# Market fields read by the trading pipeline and the RAG loaders. Streaming
+# fetches project raw markets down to these and drop images, nested
+# events/tags and rewards.
+MARKET_FIELDS = MarketRecord._fields
+
+# Gamma returns these list fields as JSON-encoded strings.
+STRINGIFIED_MARKET_FIELDS = ("outcomePrices", "clobTokenIds")
+_RECORD_FLOAT_FIELDS = (
+    "liquidity",
+    "volume",
+    "spread",
+    "orderPriceMinTickSize",
+    "rewardsMinSize",
+    "rewardsMaxSpread",
+)
+_RECORD_LIST_FIELDS = ("outcomes",) + STRINGIFIED_MARKET_FIELDS
+
+_MARKET_LIST_ADAPTER = TypeAdapter(List[Market])
+_EVENT_LIST_ADAPTER = TypeAdapter(List[PolymarketEvent])
+
+
+def project(item: dict, fields: Optional[tuple]) -> dict:
+    if fields is None:
+        return item
+    return {key: item[key] for key in fields if key in item}
+
+
+def decode_stringified_fields(market_object: dict) -> dict:
+    decoded = dict(market_object)
+    for key in STRINGIFIED_MARKET_FIELDS:
+        if isinstance(decoded.get(key), str):
+            decoded[key] = json.loads(decoded[key])
+    return decoded
+
+
+def parse_market_record(market_object: dict) -> MarketRecord:
+    values = {field: market_object.get(field) for field in MarketRecord._fields}
+    values["id"] = int(values["id"])
+    for field in _RECORD_FLOAT_FIELDS:
+        if values[field] is not None:
+            values[field] = float(values[field])
+    for field in _RECORD_LIST_FIELDS:
+        if isinstance(values[field], str):
+            values[field] = json.loads(values[field])
+    return MarketRecord(**values)
 
 
 class GammaMarketClient:
@@ -10,6 +62,9 @@ class GammaMarketClient:
         self.gamma_url = "https://gamma-api.polymarket.com"
         self.gamma_markets_endpoint = self.gamma_url + "/markets"
         self.gamma_events_endpoint = self.gamma_url + "/events"
+        # upper bound on offset pages fetched in parallel by the paginators
+        self.max_concurrency = int(os.getenv("GAMMA_MAX_CONCURRENCY", "8"))
+        self.cache = get_response_cache()
 
     def parse_pydantic_market(self, market_object: dict) -> Market:
         try:
@@ -25,27 +80,45 @@ class GammaMarketClient:
                     events.append(self.parse_nested_event(market_event_obj))
                 market_object["events"] = events
 
-            # These two fields below are returned as stringified lists from the api
-            if "outcomePrices" in market_object:
-                market_object["outcomePrices"] = json.loads(
-                    market_object["outcomePrices"]
-                )
-            if "clobTokenIds" in market_object:
-                market_object["clobTokenIds"] = json.loads(
-                    market_object["clobTokenIds"]
-                )
+            # These fields are returned as stringified lists from the api
+            for key in STRINGIFIED_MARKET_FIELDS:
+                if isinstance(market_object.get(key), str):
+                    market_object[key] = json.loads(market_object[key])
 
             return Market(**market_object)
         except Exception as err:
             print(f"[parse_market] Caught exception: {err}")
             print("exception while handling object:", market_object)
 
+    def parse_pydantic_markets(self, market_objects: "list[dict]") -> "list[Market]":
+        """
+        Decode a whole page of markets in one ``TypeAdapter`` pass, falling back
+        to per-market parsing (which logs and skips bad markets) on failure.
+        """
+        prepared = [decode_stringified_fields(m) for m in market_objects]
+        try:
+            return _MARKET_LIST_ADAPTER.validate_python(prepared)
+        except ValidationError:
+            return [self.parse_pydantic_market(m) for m in prepared]
+
+    def parse_market_records(
+        self, market_objects: "list[dict]"
+    ) -> "list[MarketRecord]":
+        """Fast path for trusted upstream data: no validation, compact records."""
+        return [parse_market_record(m) for m in market_objects]
+
+    def parse_pydantic_events(
+        self, event_objects: "list[dict]"
+    ) -> "list[PolymarketEvent]":
+        try:
+            return _EVENT_LIST_ADAPTER.validate_python(event_objects)
+        except ValidationError:
+            return [self.parse_pydantic_event(dict(e)) for e in event_objects]
+
     # Event parser for events nested under a markets api response
     def parse_nested_event(self, event_object: dict()) -> PolymarketEvent:
-        print("[parse_nested_event] called with:", event_object)
         try:
             if "tags" in event_object:
-                print("tags here", event_object["tags"])
                 tags: list[Tag] = []
                 for tag in event_object["tags"]:
                     tags.append(Tag(**tag))
@@ -59,7 +132,6 @@ class GammaMarketClient:
     def parse_pydantic_event(self, event_object: dict) -> PolymarketEvent:
         try:
             if "tags" in event_object:
-                print("tags here", event_object["tags"])
                 tags: list[Tag] = []
                 for tag in event_object["tags"]:
                     tags.append(Tag(**tag))
@@ -69,14 +141,19 @@ class GammaMarketClient:
             print(f"[parse_event] Caught exception: {err}")
 
     def get_markets(
-        self, querystring_params={}, parse_pydantic=False, local_file_path=None
+        self,
+        querystring_params={},
+        parse_pydantic=False,
+        local_file_path=None,
+        use_cache=True,
     ) -> "list[Market]":
         if parse_pydantic and local_file_path is not None:
             raise Exception(
                 'Cannot use "parse_pydantic" and "local_file" params simultaneously.'
             )
 
-        response = httpx.get(self.gamma_markets_endpoint, params=querystring_params)
+        fetch = self.cache.get if use_cache else transport.get
+        response = fetch(self.gamma_markets_endpoint, params=querystring_params)
         if response.status_code == 200:
             data = response.json()
             if local_file_path is not None:
@@ -85,13 +162,26 @@ class GammaMarketClient:
             elif not parse_pydantic:
                 return data
             else:
-                markets: list[Market] = []
-                for market_object in data:
-                    markets.append(self.parse_pydantic_market(market_object))
-                return markets
+                return self.parse_pydantic_markets(data)
         else:
             print(f"Error response returned from api: HTTP {response.status_code}")
-            raise Exception()
+            response.raise_for_status()
+
+    def iter_markets(
+        self, querystring_params={}, fields=MARKET_FIELDS
+    ) -> "Iterator[dict]":
+        """
+        Stream one markets page, yielding each market projected to ``fields``
+        as soon as it is decoded rather than after the whole body arrives.
+        """
+        with transport.stream(
+            "GET", self.gamma_markets_endpoint, params=querystring_params
+        ) as response:
+            if response.status_code != 200:
+                print(f"Error response returned from api: HTTP {response.status_code}")
+                response.raise_for_status()
+            for market in iter_json_array(response.iter_text(chunk_size=65536)):
+                yield project(market, fields)
 
     def get_events(
         self, querystring_params={}, parse_pydantic=False, local_file_path=None
@@ -101,7 +191,7 @@ class GammaMarketClient:
                 'Cannot use "parse_pydantic" and "local_file" params simultaneously.'
             )
 
-        response = httpx.get(self.gamma_events_endpoint, params=querystring_params)
+        response = self.cache.get(self.gamma_events_endpoint, params=querystring_params)
         if response.status_code == 200:
             data = response.json()
             if local_file_path is not None:
@@ -110,12 +200,10 @@ class GammaMarketClient:
             elif not parse_pydantic:
                 return data
             else:
-                events: list[PolymarketEvent] = []
-                for market_event_obj in data:
-                    events.append(self.parse_pydantic_event(market_event_obj))
-                return events
+                return self.parse_pydantic_events(data)
         else:
-            raise Exception()
+            print(f"Error response returned from api: HTTP {response.status_code}")
+            response.raise_for_status()
 
     def get_all_markets(self, limit=2) -> "list[Market]":
         return self.get_markets(querystring_params={"limit": limit})
@@ -133,25 +221,66 @@ class GammaMarketClient:
             }
         )
 
-    def get_all_current_markets(self, limit=100) -> "list[Market]":
+    def _iter_all_pages(
+        self, fetch_page, querystring_params: dict, limit: int, max_workers=None
+    ) -> Iterator:
+        """
+        Walk ``offset`` pages concurrently and yield their items in order.
+
+        Offsets are probed in windows that start at one page and double up to
+        ``max_workers``, so small result sets cost a single request. The first
+        short page marks the end of the data; pages past it are discarded.
+        """
+        max_workers = max(1, max_workers or self.max_concurrency)
         offset = 0
-        all_markets = []
-        while True:
-            params = {
-                "active": True,
-                "closed": False,
-                "archived": False,
-                "limit": limit,
-                "offset": offset,
-            }
-            market_batch = self.get_markets(querystring_params=params)
-            all_markets.extend(market_batch)
+        window = 1
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                offsets = [offset + i * limit for i in range(window)]
+                pages = pool.map(
+                    lambda page_offset: fetch_page(
+                        querystring_params={
+                            **querystring_params,
+                            "limit": limit,
+                            "offset": page_offset,
+                        }
+                    ),
+                    offsets,
+                )
+                for page in pages:
+                    yield from page
+                    if len(page) < limit:
+                        return
+                offset += window * limit
+                window = min(window * 2, max_workers)
+
+    def get_all_current_markets(
+        self, limit=100, max_workers=None, use_cache=True
+    ) -> "list[Market]":
+        params = {
+            "active": True,
+            "closed": False,
+            "archived": False,
+        }
+
+        def fetch_page(querystring_params):
+            return self.get_markets(querystring_params, use_cache=use_cache)
+
+        return list(self._iter_all_pages(fetch_page, params, limit, max_workers))
+
+    def iter_all_current_markets(
+        self, limit=100, max_workers=None, fields=MARKET_FIELDS
+    ) -> "Iterator[dict]":
+        params = {
+            "active": True,
+            "closed": False,
+            "archived": False,
+        }
 
-            if len(market_batch) < limit:
-                break
-            offset += limit
+        def fetch_page(querystring_params):
+            return list(self.iter_markets(querystring_params, fields))
 
-        return all_markets
+        return self._iter_all_pages(fetch_page, params, limit, max_workers)
 
     def get_current_events(self, limit=4) -> "list[PolymarketEvent]":
         return self.get_events(
@@ -163,6 +292,16 @@ class GammaMarketClient:
             }
         )
 
+    def get_all_current_events(
+        self, limit=100, max_workers=None
+    ) -> "list[PolymarketEvent]":
+        params = {
+            "active": True,
+            "closed": False,
+            "archived": False,
+        }
+        return list(self._iter_all_pages(self.get_events, params, limit, max_workers))
+
     def get_clob_tradable_markets(self, limit=2) -> "list[Market]":
         return self.get_markets(
             querystring_params={
@@ -177,11 +316,73 @@ class GammaMarketClient:
     def get_market(self, market_id: int) -> dict():
         url = self.gamma_markets_endpoint + "/" + str(market_id)
         print(url)
-        response = httpx.get(url)
+        response = self.cache.get(url)
         return response.json()
 
+    def _get_markets_batched(
+        self,
+        param: str,
+        keys: "Iterable",
+        keys_of_market,
+        batch_size: int,
+        max_workers=None,
+    ) -> "Dict[str, dict]":
+        unique_keys = list(dict.fromkeys(str(key) for key in keys))
+        batches = [
+            unique_keys[i : i + batch_size]
+            for i in range(0, len(unique_keys), batch_size)
+        ]
+        if not batches:
+            return {}
+
+        max_workers = min(len(batches), max(1, max_workers or self.max_concurrency))
+        found = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pages = pool.map(
+                lambda batch: self.get_markets(
+                    querystring_params={param: batch, "limit": len(batch)}
+                ),
+                batches,
+            )
+            for page in pages:
+                for market in page:
+                    for key in keys_of_market(market):
+                        found[str(key)] = market
+        return {key: found[key] for key in unique_keys if key in found}
+
+    def get_markets_by_ids(
+        self, market_ids: "Iterable", batch_size=20, max_workers=None
+    ) -> "Dict[str, dict]":
+        """
+        Look up many markets with multi-id queries issued concurrently.
+
+        Repeated ids are fetched once. The result maps id -> market in the order
+        ids first appear; ids Gamma does not return are left out.
+        """
+        return self._get_markets_batched(
+            "id",
+            market_ids,
+            lambda market: [market["id"]],
+            batch_size,
+            max_workers,
+        )
+
+    def get_markets_by_token_ids(
+        self, token_ids: "Iterable", batch_size=20, max_workers=None
+    ) -> "Dict[str, dict]":
+        """Same as ``get_markets_by_ids`` but keyed by CLOB token id."""
+        return self._get_markets_batched(
+            "clob_token_ids",
+            token_ids,
+            lambda market: json.loads(market.get("clobTokenIds") or "[]"),
+            batch_size,
+            max_workers,
+        )
+
 
 if __name__ == "__main__":
+    from agents.polymarket.polymarket import Polymarket
+
     gamma = GammaMarketClient()
     market = gamma.get_market("253123")
     poly = Polymarket()
@@ -0,0 +1,141 @@
+import json
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Bit flags packed into MarketTable.flags
+ACTIVE = 1 << 0
+CLOSED = 1 << 1
+ARCHIVED = 1 << 2
+RESTRICTED = 1 << 3
+FUNDED = 1 << 4
+ENABLE_ORDER_BOOK = 1 << 5
+ACCEPTING_ORDERS = 1 << 6
+
+_FLAG_FIELDS = (
+    (ACTIVE, "active"),
+    (CLOSED, "closed"),
+    (ARCHIVED, "archived"),
+    (RESTRICTED, "restricted"),
+    (FUNDED, "funded"),
+    (ENABLE_ORDER_BOOK, "enableOrderBook"),
+    (ACCEPTING_ORDERS, "acceptingOrders"),
+)
+
+NUMERIC_COLUMNS = ("spread", "liquidity", "volume", "price_yes", "price_no")
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _outcome_prices(market: dict) -> list:
+    prices = market.get("outcomePrices") or []
+    if isinstance(prices, str):
+        prices = json.loads(prices)
+    return prices
+
+
+class MarketTable:
+    """
+    Column-oriented snapshot of Gamma markets for fast screening.
+
+    Numeric fields live in NumPy arrays and boolean market flags are packed
+    into one bitmap, so predicates over the whole universe are single
+    vectorized expressions and ``top_k`` uses ``argpartition`` instead of a
+    full sort. Row indices map back to the source market dicts via ``rows``.
+    """
+
+    def __init__(self, markets: "Iterable[dict]") -> None:
+        self.markets: List[dict] = list(markets)
+        n = len(self.markets)
+        self.ids = np.empty(n, dtype=np.int64)
+        self.spread = np.empty(n, dtype=np.float64)
+        self.liquidity = np.empty(n, dtype=np.float64)
+        self.volume = np.empty(n, dtype=np.float64)
+        self.price_yes = np.empty(n, dtype=np.float64)
+        self.price_no = np.empty(n, dtype=np.float64)
+        self.flags = np.zeros(n, dtype=np.uint16)
+        end_dates = []
+
+        for i, market in enumerate(self.markets):
+            self.ids[i] = int(market["id"])
+            self.spread[i] = _to_float(market.get("spread"))
+            self.liquidity[i] = _to_float(market.get("liquidity"))
+            self.volume[i] = _to_float(market.get("volume"))
+            prices = _outcome_prices(market)
+            self.price_yes[i] = _to_float(prices[0]) if len(prices) > 0 else np.nan
+            self.price_no[i] = _to_float(prices[1]) if len(prices) > 1 else np.nan
+            flags = 0
+            for bit, field in _FLAG_FIELDS:
+                if market.get(field):
+                    flags |= bit
+            self.flags[i] = flags
+            end_date = market.get("endDate")
+            # datetime64 has no timezone support; Gamma dates are all UTC
+            end_dates.append(end_date[:19] if end_date else "NaT")
+
+        self.end_date = np.array(end_dates, dtype="datetime64[s]")
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def mask(
+        self,
+        require: int = 0,
+        exclude: int = 0,
+        min_liquidity: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        max_spread: Optional[float] = None,
+        ends_after: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Boolean row mask. ``require``/``exclude`` are OR-ed flag constants that
+        must all be set / all be clear; numeric bounds skip rows with no value.
+        """
+        selected = (self.flags & require) == require
+        if exclude:
+            selected &= (self.flags & exclude) == 0
+        if min_liquidity is not None:
+            selected &= self.liquidity >= min_liquidity
+        if min_volume is not None:
+            selected &= self.volume >= min_volume
+        if max_spread is not None:
+            selected &= self.spread <= max_spread
+        if ends_after is not None:
+            selected &= self.end_date > np.datetime64(ends_after[:19], "s")
+        return selected
+
+    def tradeable_mask(self) -> np.ndarray:
+        return self.mask(require=ACTIVE, exclude=CLOSED | ARCHIVED | RESTRICTED)
+
+    def top_k(
+        self,
+        column: str,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        descending: bool = True,
+    ) -> np.ndarray:
+        """Row indices of the ``k`` best rows by ``column``, best first."""
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"unknown column {column!r}, expected {NUMERIC_COLUMNS}")
+        values = getattr(self, column)
+        candidates = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        keys = values[candidates]
+        keys = -keys if descending else keys.copy()
+        # rows without a value sort last
+        keys[np.isnan(keys)] = np.inf
+        k = min(k, len(candidates))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(candidates):
+            part = np.argpartition(keys, k - 1)[:k]
+        else:
+            part = np.arange(len(candidates))
+        return candidates[part[np.argsort(keys[part], kind="stable")]]
+
+    def rows(self, indices: "Iterable[int]") -> List[dict]:
+        return [self.markets[i] for i in indices]
@@ -0,0 +1,201 @@
+"""
+Batched on-chain reads for a trading wallet.
+
+``ChainReader.wallet_snapshot`` packs the USDC balance, USDC allowances and
+CTF operator approvals for every exchange spender, plus all CTF position
+balances (one ``balanceOfBatch``), into a single Multicall3 ``aggregate3``
+``eth_call``. Every read is pinned to a block number and the results are
+cached per block, so repeated reads within one block cost nothing.
+
+Multicall3 is deployed at the same address on most EVM chains, Polygon
+included. Override it with ``POLYAI_MULTICALL3_ADDRESS``, or set that to an
+empty string to issue the calls one by one instead.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+from pydantic import BaseModel
+
+MULTICALL3_ADDRESS = os.getenv(
+    "POLYAI_MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11"
+)
+# Polygon PoS produces a block roughly every two seconds
+BLOCK_TIME_SECONDS = float(os.getenv("POLYAI_BLOCK_TIME_SECONDS", "2"))
+
+USDC_DECIMALS = 6
+CTF_DECIMALS = 6
+
+BALANCE_OF = function_signature_to_4byte_selector("balanceOf(address)")
+ALLOWANCE = function_signature_to_4byte_selector("allowance(address,address)")
+IS_APPROVED_FOR_ALL = function_signature_to_4byte_selector(
+    "isApprovedForAll(address,address)"
+)
+BALANCE_OF_BATCH = function_signature_to_4byte_selector(
+    "balanceOfBatch(address[],uint256[])"
+)
+AGGREGATE3 = function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])")
+
+Call = Tuple[str, bytes]  # (target, calldata)
+
+
+class WalletSnapshot(BaseModel):
+    block_number: int
+    usdc_balance: float
+    allowances: Dict[str, int]  # spender -> raw USDC allowance
+    ctf_approvals: Dict[str, bool]  # operator -> isApprovedForAll
+    positions: Dict[str, float]  # token id -> shares
+
+
+class ChainReader:
+    def __init__(
+        self,
+        web3,
+        usdc_address: str,
+        ctf_address: str,
+        multicall_address: Optional[str] = MULTICALL3_ADDRESS,
+        block_time: float = BLOCK_TIME_SECONDS,
+    ) -> None:
+        self.web3 = web3
+        self.usdc_address = to_checksum_address(usdc_address)
+        self.ctf_address = to_checksum_address(ctf_address)
+        self.multicall_address = (
+            to_checksum_address(multicall_address) if multicall_address else None
+        )
+        self.block_time = block_time
+        self._lock = threading.Lock()
+        self._block: Optional[int] = None
+        self._block_checked = 0.0
+        self._cache: Dict[tuple, WalletSnapshot] = {}
+        self.rpc_calls = 0
+        self.hits = 0
+
+    def block_number(self) -> int:
+        """Latest block number, re-read at most once per block time."""
+        with self._lock:
+            if (
+                self._block is not None
+                and time.monotonic() - self._block_checked < self.block_time
+            ):
+                return self._block
+        block = self.web3.eth.block_number
+        with self._lock:
+            self.rpc_calls += 1
+            self._block_checked = time.monotonic()
+            if self._block is None or block > self._block:
+                # a new block invalidates everything read at older ones
+                self._block = block
+                self._cache.clear()
+            return self._block
+
+    def _eth_call(self, target: str, data: bytes, block: int) -> bytes:
+        with self._lock:
+            self.rpc_calls += 1
+        return bytes(self.web3.eth.call({"to": target, "data": data}, block))
+
+    def multicall(
+        self, calls: "Sequence[Call]", block: int
+    ) -> "List[Tuple[bool, bytes]]":
+        """Run ``calls`` at ``block``; returns (success, return data) per call."""
+        if self.multicall_address is None:
+            results = []
+            for target, data in calls:
+                try:
+                    results.append((True, self._eth_call(target, data, block)))
+                except Exception:
+                    results.append((False, b""))
+            return results
+        payload = AGGREGATE3 + encode(
+            ["(address,bool,bytes)[]"],
+            [[(target, True, data) for target, data in calls]],
+        )
+        raw = self._eth_call(self.multicall_address, payload, block)
+        return [
+            (success, bytes(data))
+            for success, data in decode(["(bool,bytes)[]"], raw)[0]
+        ]
+
+    def wallet_snapshot(
+        self,
+        address: str,
+        spenders: "Iterable[str]" = (),
+        token_ids: "Iterable[str]" = (),
+    ) -> WalletSnapshot:
+        address = to_checksum_address(address)
+        spenders = [to_checksum_address(spender) for spender in spenders]
+        token_ids = list(dict.fromkeys(str(token_id) for token_id in token_ids))
+
+        block = self.block_number()
+        key = (block, address, tuple(spenders), tuple(token_ids))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        calls: List[Call] = [
+            (self.usdc_address, BALANCE_OF + encode(["address"], [address]))
+        ]
+        for spender in spenders:
+            calls.append(
+                (
+                    self.usdc_address,
+                    ALLOWANCE + encode(["address", "address"], [address, spender]),
+                )
+            )
+            calls.append(
+                (
+                    self.ctf_address,
+                    IS_APPROVED_FOR_ALL
+                    + encode(["address", "address"], [address, spender]),
+                )
+            )
+        if token_ids:
+            calls.append(
+                (
+                    self.ctf_address,
+                    BALANCE_OF_BATCH
+                    + encode(
+                        ["address[]", "uint256[]"],
+                        [[address] * len(token_ids), [int(t) for t in token_ids]],
+                    ),
+                )
+            )
+
+        results = iter(self.multicall(calls, block))
+
+        def read(types: "list[str]"):
+            success, data = next(results)
+            if not success:
+                raise RuntimeError(f"on-chain read failed at block {block}")
+            return decode(types, data)[0]
+
+        usdc_balance = read(["uint256"]) / 10**USDC_DECIMALS
+        allowances = {}
+        ctf_approvals = {}
+        for spender in spenders:
+            allowances[spender] = read(["uint256"])
+            ctf_approvals[spender] = read(["bool"])
+        positions = {}
+        if token_ids:
+            balances = read(["uint256[]"])
+            positions = {
+                token_id: balance / 10**CTF_DECIMALS
+                for token_id, balance in zip(token_ids, balances)
+            }
+
+        snapshot = WalletSnapshot(
+            block_number=block,
+            usdc_balance=usdc_balance,
+            allowances=allowances,
+            ctf_approvals=ctf_approvals,
+            positions=positions,
+        )
+        with self._lock:
+            if block == self._block:
+                self._cache[key] = snapshot
+        return snapshot
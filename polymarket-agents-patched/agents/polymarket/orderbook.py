@@ -0,0 +1,410 @@
+"""
+In-memory mirror of CLOB order books.
+
+An ``OrderBookMirror`` keeps sorted bid/ask ladders for the tokens it tracks.
+It applies ``book`` snapshots and ``price_change`` deltas pushed by the CLOB
+market websocket. While the feed is down, it falls back to polling the
+REST ``/books`` endpoint. Prices, depth and the age of every book are read
+from memory, so callers never block on the network.
+
+A book is as fresh as the last sign that it is still current. A quiet market
+sends no deltas, so while the feed is connected, any message, pong or
+heartbeat on the connection confirms every book it carries. Once the feed
+drops, a book ages from its own last update.
+
+The feed is any object with ``run(token_ids, on_message, on_open,
+on_heartbeat)`` (blocking until closed) and ``close()``, so tests can drive
+the mirror with a local fake. ``on_open`` fires once the subscription is
+sent, and ``on_heartbeat`` on every pong.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import websocket
+
+from agents.utils import transport
+
+CLOB_WS_MARKET_URL = os.getenv(
+    "POLYAI_CLOB_WS_URL", "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+)
+POLL_INTERVAL_SECONDS = float(os.getenv("POLYAI_ORDERBOOK_POLL_SECONDS", "5"))
+
+Level = Tuple[float, float]
+
+
+class Ladder:
+    """One side of a book: price -> size, with prices kept sorted best first."""
+
+    def __init__(self, descending: bool) -> None:
+        self.descending = descending
+        self.sizes: Dict[float, float] = {}
+        # sort keys ascending; bids are stored negated so index 0 is best
+        self._keys: List[float] = []
+
+    def _key(self, price: float) -> float:
+        return -price if self.descending else price
+
+    def set(self, price: float, size: float) -> None:
+        key = self._key(price)
+        if size <= 0:
+            if self.sizes.pop(price, None) is not None:
+                del self._keys[bisect.bisect_left(self._keys, key)]
+            return
+        if price not in self.sizes:
+            bisect.insort(self._keys, key)
+        self.sizes[price] = size
+
+    def clear(self) -> None:
+        self.sizes.clear()
+        self._keys.clear()
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        price = self._key(self._keys[0])
+        return price, self.sizes[price]
+
+    def levels(self, n: Optional[int] = None) -> List[Level]:
+        keys = self._keys if n is None else self._keys[:n]
+        return [(self._key(k), self.sizes[self._key(k)]) for k in keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class OrderBook:
+    def __init__(self, token_id: str) -> None:
+        self.token_id = token_id
+        self.bids = Ladder(descending=True)
+        self.asks = Ladder(descending=False)
+        self.updated_at: Optional[float] = None  # local wall clock of last update
+        self.server_timestamp: Optional[float] = None
+        self.source: Optional[str] = None  # "feed" or "poll"
+
+    def _touch(self, timestamp: Optional[float], source: str) -> None:
+        self.updated_at = time.time()
+        if timestamp is not None:
+            self.server_timestamp = timestamp
+        self.source = source
+
+    def apply_snapshot(
+        self,
+        bids: Iterable[dict],
+        asks: Iterable[dict],
+        timestamp: Optional[float] = None,
+        source: str = "feed",
+    ) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        for level in bids:
+            self.bids.set(float(level["price"]), float(level["size"]))
+        for level in asks:
+            self.asks.set(float(level["price"]), float(level["size"]))
+        self._touch(timestamp, source)
+
+    def apply_change(
+        self,
+        side: str,
+        price: float,
+        size: float,
+        timestamp: Optional[float] = None,
+        source: str = "feed",
+    ) -> None:
+        ladder = self.bids if side.upper() == "BUY" else self.asks
+        ladder.set(float(price), float(size))
+        self._touch(timestamp, source)
+
+    def best_bid(self) -> Optional[float]:
+        best = self.bids.best()
+        return best[0] if best else None
+
+    def best_ask(self) -> Optional[float]:
+        best = self.asks.best()
+        return best[0] if best else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def depth(self, levels: Optional[int] = None) -> Dict[str, List[Level]]:
+        return {"bids": self.bids.levels(levels), "asks": self.asks.levels(levels)}
+
+    def age(self) -> Optional[float]:
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+
+def _timestamp_seconds(value) -> Optional[float]:
+    # CLOB timestamps are epoch milliseconds, sent as strings
+    try:
+        return float(value) / 1000
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_books(
+    token_ids: "list[str]", clob_url: str = "https://clob.polymarket.com"
+) -> "list[dict]":
+    """Fetch raw order book snapshots for ``token_ids`` in one REST call."""
+    response = transport.post(
+        f"{clob_url}/books", json=[{"token_id": token_id} for token_id in token_ids]
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+class ClobMarketFeed:
+    """Push feed over the CLOB market websocket channel."""
+
+    def __init__(self, url: str = CLOB_WS_MARKET_URL) -> None:
+        self.url = url
+        self._app: Optional[websocket.WebSocketApp] = None
+        self._error: Optional[Exception] = None
+
+    def run(
+        self,
+        token_ids: "list[str]",
+        on_message: Callable[[str], None],
+        on_open: Optional[Callable[[], None]] = None,
+        on_heartbeat: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._error = None
+
+        def subscribe(ws):
+            ws.send(json.dumps({"assets_ids": token_ids, "type": "market"}))
+            if on_open is not None:
+                on_open()
+
+        def on_error(ws, error):
+            self._error = error
+
+        self._app = websocket.WebSocketApp(
+            self.url,
+            on_open=subscribe,
+            on_message=lambda ws, message: on_message(message),
+            on_error=on_error,
+            on_pong=(lambda ws, data: on_heartbeat()) if on_heartbeat else None,
+        )
+        self._app.run_forever(ping_interval=10, ping_timeout=5)
+        if self._error is not None:
+            raise ConnectionError(f"order book feed failed: {self._error}")
+
+    def close(self) -> None:
+        if self._app is not None:
+            self._app.close()
+
+
+class OrderBookMirror:
+    def __init__(
+        self,
+        token_ids: "Iterable[str]" = (),
+        feed=None,
+        fetch_books: Callable[["list[str]"], "list[dict]"] = fetch_books,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self.feed = feed if feed is not None else ClobMarketFeed()
+        self.fetch_books = fetch_books
+        self.poll_interval = poll_interval
+        self.books: Dict[str, OrderBook] = {}
+        self.feed_connected = False
+        # local wall clock of the last open, message or pong on the feed
+        self.feed_alive_at: Optional[float] = None
+        self.messages = 0
+        self.polls = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._resubscribe = False
+        self._thread: Optional[threading.Thread] = None
+        self.track(token_ids)
+
+    def track(self, token_ids: "Iterable[str]") -> None:
+        with self._lock:
+            new = [t for t in token_ids if t not in self.books]
+            for token_id in new:
+                self.books[token_id] = OrderBook(token_id)
+        if new and self.running:
+            # the market channel subscribes on connect, so reconnect with the
+            # full set; the server replays a snapshot for every token
+            self._resubscribe = True
+            self.feed.close()
+
+    def token_ids(self) -> List[str]:
+        with self._lock:
+            return list(self.books)
+
+    def handle_message(self, message) -> None:
+        """Apply one feed message (raw JSON, a dict, or a list of dicts)."""
+        if isinstance(message, (str, bytes)):
+            message = json.loads(message)
+        events = message if isinstance(message, list) else [message]
+        with self._lock:
+            self.feed_alive_at = time.time()
+            for event in events:
+                self.messages += 1
+                self._apply_event(event)
+
+    def _apply_event(self, event: dict) -> None:
+        event_type = event.get("event_type")
+        timestamp = _timestamp_seconds(event.get("timestamp"))
+        if event_type == "book":
+            book = self.books.get(event.get("asset_id"))
+            if book is not None:
+                book.apply_snapshot(
+                    event.get("bids") or event.get("buys") or [],
+                    event.get("asks") or event.get("sells") or [],
+                    timestamp,
+                )
+        elif event_type == "price_change":
+            if "price_changes" in event:
+                changes = event["price_changes"]
+            else:
+                changes = [
+                    dict(change, asset_id=event.get("asset_id"))
+                    for change in event.get("changes", [])
+                ]
+            for change in changes:
+                book = self.books.get(change.get("asset_id"))
+                if book is not None:
+                    book.apply_change(
+                        change["side"], change["price"], change["size"], timestamp
+                    )
+
+    def _on_feed_open(self, subscribed: "list[str]") -> None:
+        self.feed_alive_at = time.time()
+        self.feed_connected = True
+        # a token tracked while connecting missed both the subscription and
+        # track()'s close of a socket that did not exist yet
+        if set(self.token_ids()) - set(subscribed):
+            self._resubscribe = True
+            self.feed.close()
+
+    def _on_feed_heartbeat(self) -> None:
+        self.feed_alive_at = time.time()
+
+    def _age(self, book: OrderBook) -> Optional[float]:
+        age = book.age()
+        if age is None or not self.feed_connected or self.feed_alive_at is None:
+            return age
+        # a live feed would have pushed any change, so an unchanged book is
+        # current as of the feed's last sign of life
+        return min(age, time.time() - self.feed_alive_at)
+
+    def poll_once(self) -> None:
+        token_ids = self.token_ids()
+        if not token_ids:
+            return
+        snapshots = self.fetch_books(token_ids)
+        with self._lock:
+            self.polls += 1
+            for snapshot in snapshots:
+                book = self.books.get(snapshot.get("asset_id"))
+                if book is not None:
+                    book.apply_snapshot(
+                        snapshot.get("bids") or [],
+                        snapshot.get("asks") or [],
+                        _timestamp_seconds(snapshot.get("timestamp")),
+                        source="poll",
+                    )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "OrderBookMirror":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self.feed.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._resubscribe = False
+            subscribed = self.token_ids()
+            try:
+                self.feed.run(
+                    subscribed,
+                    self.handle_message,
+                    on_open=lambda: self._on_feed_open(subscribed),
+                    on_heartbeat=self._on_feed_heartbeat,
+                )
+                failed = False
+            except Exception as e:
+                print(f"[OrderBookMirror] feed error, polling instead: {e}")
+                failed = True
+            finally:
+                self.feed_connected = False
+            if self._stop.is_set():
+                break
+            if failed or not self._resubscribe:
+                # feed is down: serve REST snapshots until the next reconnect
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    print(f"[OrderBookMirror] poll error: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def book(self, token_id: str) -> Optional[OrderBook]:
+        return self.books.get(token_id)
+
+    def best_bid(self, token_id: str) -> Optional[float]:
+        with self._lock:
+            book = self.books.get(token_id)
+            return book.best_bid() if book else None
+
+    def best_ask(self, token_id: str) -> Optional[float]:
+        with self._lock:
+            book = self.books.get(token_id)
+            return book.best_ask() if book else None
+
+    def mid(self, token_id: str) -> Optional[float]:
+        with self._lock:
+            book = self.books.get(token_id)
+            return book.mid() if book else None
+
+    def depth(self, token_id: str, levels: Optional[int] = None) -> dict:
+        with self._lock:
+            book = self.books.get(token_id)
+            return book.depth(levels) if book else {"bids": [], "asks": []}
+
+    def is_fresh(self, token_id: str, max_age: float) -> bool:
+        with self._lock:
+            book = self.books.get(token_id)
+            age = self._age(book) if book else None
+        return age is not None and age <= max_age
+
+    def quote(self, token_id: str) -> Optional[dict]:
+        """Top of book plus freshness for ``token_id``, or None if untracked."""
+        with self._lock:
+            book = self.books.get(token_id)
+            if book is None:
+                return None
+            return {
+                "token_id": token_id,
+                "best_bid": book.best_bid(),
+                "best_ask": book.best_ask(),
+                "mid": book.mid(),
+                "spread": book.spread(),
+                "updated_at": book.updated_at,
+                "server_timestamp": book.server_timestamp,
+                "age": self._age(book),
+                "source": book.source,
+            }
@@ -0,0 +1,267 @@
+"""
+Paper trading against live or recorded order books.
+
+``PaperTrader`` exposes the same ``execute_order`` / ``execute_market_order``
+interface as ``Polymarket``. Instead of posting, it walks the opposing side
+of the token's order book, producing partial fills, a volume-weighted fill
+price and slippage against the touch. FOK orders that cannot fill in full
+are killed. By default fills consume the simulated book's liquidity, so a
+burst of orders sees the depth it has already taken.
+
+Books come from a ``{token_id: OrderBookSummary | dict}`` mapping (recorded;
+see ``save_books`` / ``load_books``) or from a callable such as
+``Polymarket.get_orderbook`` (live, re-fetched after ``book_ttl`` seconds).
+Fills are written to a separate paper journal in batches, so replaying
+thousands of orders per second is not bounded by journal I/O.
+"""
+
+import ast
+import atexit
+import json
+import os
+import time
+import uuid
+import weakref
+from typing import Callable, Dict, List, Optional, Union
+
+from agents.notifications.state import add_trades
+
+PAPER_STATE_PATH = os.getenv("POLYAI_PAPER_STATE_PATH", "data/paper_journal.json")
+
+# traders with unflushed fills; weak, so registering keeps no trader alive
+_open_traders: "weakref.WeakSet[PaperTrader]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_traders() -> None:
+    for trader in list(_open_traders):
+        trader.flush()
+
+
+def _levels(levels) -> List[List[float]]:
+    out = []
+    for level in levels or []:
+        if isinstance(level, dict):
+            out.append([float(level["price"]), float(level["size"])])
+        else:
+            out.append([float(level.price), float(level.size)])
+    return out
+
+
+def _book_field(book, name: str):
+    return book.get(name) if isinstance(book, dict) else getattr(book, name, None)
+
+
+class PaperBook:
+    """Mutable ladders for one token: asks best (lowest) first, bids best first."""
+
+    def __init__(self, book) -> None:
+        self.asks = sorted(_levels(_book_field(book, "asks")), key=lambda l: l[0])
+        self.bids = sorted(
+            _levels(_book_field(book, "bids")), key=lambda l: l[0], reverse=True
+        )
+        self.loaded_at = time.monotonic()
+
+    def match(
+        self,
+        side: str,
+        limit_price: Optional[float] = None,
+        size: Optional[float] = None,
+        amount: Optional[float] = None,
+        consume: bool = True,
+    ):
+        """
+        Walk the opposing ladder until ``size`` shares (or ``amount`` USDC for
+        market buys) are filled or ``limit_price`` is reached. Returns
+        (shares filled, USDC notional, touch price).
+        """
+        buy = side.upper() == "BUY"
+        ladder = self.asks if buy else self.bids
+        touch = next((price for price, size in ladder if size > 1e-12), None)
+        filled = 0.0
+        notional = 0.0
+        used = 0
+        for level in ladder:
+            price, available = level
+            if limit_price is not None and (
+                price > limit_price if buy else price < limit_price
+            ):
+                break
+            if available <= 1e-12:
+                # an emptied level; the depth behind it is still there
+                used += 1
+                continue
+            if amount is not None:
+                take = min(available, (amount - notional) / price)
+            else:
+                take = min(available, size - filled)
+            if take <= 0:
+                break
+            filled += take
+            notional += take * price
+            if consume:
+                level[1] = available - take
+                if level[1] <= 1e-12:
+                    used += 1
+            if (amount is not None and notional >= amount - 1e-9) or (
+                size is not None and filled >= size - 1e-9
+            ):
+                break
+        if consume and used:
+            del ladder[:used]
+        return filled, notional, touch
+
+
+class PaperFill(dict):
+    """CLOB-style order response with the simulated fill details."""
+
+
+class PaperTrader:
+    def __init__(
+        self,
+        books: "Union[Dict[str, object], Callable[[str], object]]",
+        consume: bool = True,
+        book_ttl: float = 5.0,
+        journal: bool = True,
+        journal_path: str = PAPER_STATE_PATH,
+        journal_batch: int = 500,
+    ) -> None:
+        self.books = books
+        self.consume = consume
+        self.book_ttl = book_ttl
+        self.journal = journal
+        self.journal_path = journal_path
+        self.journal_batch = journal_batch
+        self._books: Dict[str, PaperBook] = {}
+        self._pending: List[dict] = []
+        self.orders = 0
+        self.fills = 0
+        _open_traders.add(self)
+
+    def book(self, token_id: str) -> PaperBook:
+        book = self._books.get(token_id)
+        live = callable(self.books)
+        if book is None or (live and time.monotonic() - book.loaded_at > self.book_ttl):
+            source = self.books(token_id) if live else self.books[token_id]
+            book = PaperBook(source)
+            self._books[token_id] = book
+        return book
+
+    def execute(
+        self,
+        token_id: str,
+        side: str,
+        price: Optional[float] = None,
+        size: Optional[float] = None,
+        amount: Optional[float] = None,
+        fok: bool = False,
+        market_question: str = "Unknown Market",
+    ) -> PaperFill:
+        self.orders += 1
+        book = self.book(token_id)
+        # FOK needs a dry run so a kill leaves the book untouched
+        filled, notional, touch = book.match(
+            side, price, size, amount, consume=self.consume and not fok
+        )
+        requested = amount if amount is not None else size
+        done = notional if amount is not None else filled
+        complete = requested is not None and done >= requested - 1e-9
+        if fok and complete and self.consume:
+            book.match(side, price, size, amount, consume=True)
+        if fok and not complete:
+            filled, notional, status = 0.0, 0.0, "killed"
+        elif complete:
+            status = "matched"
+        elif filled > 0:
+            status = "partial"
+        else:
+            status = "live"  # nothing crossed; a real GTC order would rest
+
+        avg_price = notional / filled if filled else None
+        slippage_bps = None
+        if avg_price is not None and touch:
+            direction = 1 if side.upper() == "BUY" else -1
+            slippage_bps = direction * (avg_price - touch) / touch * 10_000
+        fill = PaperFill(
+            success=status != "killed",
+            orderID=f"paper-{uuid.uuid4()}",
+            status=status,
+            token_id=token_id,
+            side=side.upper(),
+            filled_size=filled,
+            notional_usdc=notional,
+            avg_price=avg_price,
+            touch_price=touch,
+            slippage_bps=slippage_bps,
+        )
+        if filled > 0:
+            self.fills += 1
+            if self.journal:
+                self._journal(fill, market_question)
+        return fill
+
+    def _journal(self, fill: PaperFill, market_question: str) -> None:
+        self._pending.append(
+            {
+                "id": fill["orderID"],
+                "market_question": market_question,
+                "token_id": fill["token_id"],
+                "amount_usdc": fill["notional_usdc"],
+                "raw_response": json.dumps(fill),
+                "paper": True,
+            }
+        )
+        if len(self._pending) >= self.journal_batch:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            add_trades(self._pending, self.journal_path)
+            self._pending = []
+
+    def close(self) -> None:
+        """Flush pending fills; the trader is no longer flushed at exit."""
+        self.flush()
+        _open_traders.discard(self)
+
+    def execute_order(self, price, size, side, token_id) -> PaperFill:
+        return self.execute(token_id, side, price=float(price), size=float(size))
+
+    def execute_market_order(self, market, amount, outcome_index: int = 1) -> PaperFill:
+        metadata = market[0].dict()["metadata"]
+        token_id = ast.literal_eval(metadata["clob_token_ids"])[outcome_index]
+        market_question = metadata.get("question", "Unknown Market")
+        fill = self.execute(
+            token_id,
+            "BUY",
+            amount=float(amount),
+            fok=True,
+            market_question=market_question,
+        )
+        self.flush()
+        return fill
+
+
+def save_books(books: "Dict[str, object]", path: str) -> None:
+    """Record order books (``OrderBookSummary`` or raw dicts) for replay."""
+    recorded = {
+        token_id: {
+            "bids": [[p, s] for p, s in _levels(_book_field(book, "bids"))],
+            "asks": [[p, s] for p, s in _levels(_book_field(book, "asks"))],
+        }
+        for token_id, book in books.items()
+    }
+    with open(path, "w") as f:
+        json.dump(recorded, f)
+
+
+def load_books(path: str) -> "Dict[str, dict]":
+    with open(path, "r") as f:
+        recorded = json.load(f)
+    return {
+        token_id: {
+            "bids": [{"price": p, "size": s} for p, s in book["bids"]],
+            "asks": [{"price": p, "size": s} for p, s in book["asks"]],
+        }
+        for token_id, book in recorded.items()
+    }
@@ -5,23 +5,21 @@ import os
 import pdb
 import time
 import ast
+import json
 import uuid
 import requests
+from functools import cached_property, lru_cache
 
 from dotenv import load_dotenv
-
-from web3 import Web3
-from web3.constants import MAX_INT
-from web3.middleware import geth_poa_middleware
+from eth_utils import to_checksum_address
 
 import httpx
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import ApiCreds
 from py_clob_client.constants import AMOY, POLYGON
-from py_order_utils.builders import OrderBuilder
-from py_order_utils.model import OrderData
-from py_order_utils.signer import Signer
+from py_order_utils.model import SignedOrder
 from py_clob_client.clob_types import (
+    BookParams,
     OrderArgs,
     MarketOrderArgs,
     OrderType,
@@ -29,170 +27,239 @@ from py_clob_client.clob_types import (
 )
 from py_clob_client.order_builder.constants import BUY
 
+from agents.polymarket.bulk import BulkResult, bulk_fetch
+from agents.polymarket.execution import OrderEngine, OrderTicket
+from agents.polymarket.gamma import GammaMarketClient
+from agents.polymarket.market_table import MarketTable
+from agents.polymarket.onchain import ChainReader, WalletSnapshot
+from agents.polymarket.orderbook import OrderBookMirror, fetch_books
+from agents.polymarket.signing import OrderRequest, SigningContext
+from agents.polymarket.txpipeline import TxPipeline
 from agents.utils.objects import SimpleMarket, SimpleEvent
 from agents.notifications.telegram import TelegramNotifier
-from agents.notifications.state import add_trade, open_trades
+from agents.notifications.state import open_trades
+from agents.utils import transport
+from agents.utils.http_cache import get_response_cache
+from agents.utils.singleflight import SingleFlight
 
 load_dotenv()
 
+CLOB_CREDS_PATH = os.getenv("POLYAI_CLOB_CREDS_PATH", "data/clob_creds.json")
+
+ERC20_APPROVE_ABI = """[{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"owner","type":"address"},{"indexed":true,"internalType":"address","name":"spender","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"authorizer","type":"address"},{"indexed":true,"internalType":"bytes32","name":"nonce","type":"bytes32"}],"name":"AuthorizationCanceled","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"authorizer","type":"address"},{"indexed":true,"internalType":"bytes32","name":"nonce","type":"bytes32"}],"name":"AuthorizationUsed","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"Blacklisted","type":"event"},{"anonymous":false,"inputs":[{"indexed":false,"internalType":"address","name":"userAddress","type":"address"},{"indexed":false,"internalType":"address payable","name":"relayerAddress","type":"address"},{"indexed":false,"internalType":"bytes","name":"functionSignature","type":"bytes"}],"name":"MetaTransactionExecuted","type":"event"},{"anonymous":false,"inputs":[],"name":"Pause","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"newRescuer","type":"address"}],"name":"RescuerChanged","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"bytes32","name":"role","type":"bytes32"},{"indexed":true,"internalType":"bytes32","name":"previousAdminRole","type":"bytes32"},{"indexed":true,"internalType":"bytes32","name":"newAdminRole","type":"bytes32"}],"name":"RoleAdminChanged","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"bytes32","name":"role","type":"bytes32"},{"indexed":true,"internalType":"address","name":"account","type":"address"},{"indexed":true,"internalType":"address","name":"sender","type":"address"}],"name":"RoleGranted","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"bytes32","name":"role","type":"bytes32"},{"indexed":true,"internalType":"address","name":"account","type":"address"},{"indexed":true,"internalType":"address","name":"sender","type":"address"}],"name":"RoleRevoked","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"UnBlacklisted","type":"event"},{"anonymous":false,"inputs":[],"name":"Unpause","type":"event"},{"inputs":[],"name":"APPROVE_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"BLACKLISTER_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"CANCEL_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DECREASE_ALLOWANCE_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DEFAULT_ADMIN_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DEPOSITOR_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DOMAIN_SEPARATOR","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"EIP712_VERSION","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"INCREASE_ALLOWANCE_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"META_TRANSACTION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"PAUSER_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"PERMIT_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"RESCUER_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"TRANSFER_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"WITHDRAW_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"approveWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"authorizer","type":"address"},{"internalType":"bytes32","name":"nonce","type":"bytes32"}],"name":"authorizationState","outputs":[{"internalType":"enum GasAbstraction.AuthorizationState","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"blacklist","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"blacklisters","outputs":[{"internalType":"address[]","name":"","type":"address[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"authorizer","type":"address"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"cancelAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"subtractedValue","type":"uint256"}],"name":"decreaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"decrement","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"decreaseAllowanceWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"user","type":"address"},{"internalType":"bytes","name":"depositData","type":"bytes"}],"name":"deposit","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"userAddress","type":"address"},{"internalType":"bytes","name":"functionSignature","type":"bytes"},{"internalType":"bytes32","name":"sigR","type":"bytes32"},{"internalType":"bytes32","name":"sigS","type":"bytes32"},{"internalType":"uint8","name":"sigV","type":"uint8"}],"name":"executeMetaTransaction","outputs":[{"internalType":"bytes","name":"","type":"bytes"}],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"}],"name":"getRoleAdmin","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"uint256","name":"index","type":"uint256"}],"name":"getRoleMember","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"}],"name":"getRoleMemberCount","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"grantRole","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"hasRole","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"addedValue","type":"uint256"}],"name":"increaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"increment","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"increaseAllowanceWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"string","name":"newName","type":"string"},{"internalType":"string","name":"newSymbol","type":"string"},{"internalType":"uint8","name":"newDecimals","type":"uint8"},{"internalType":"address","name":"childChainManager","type":"address"}],"name":"initialize","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"initialized","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"isBlacklisted","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"}],"name":"nonces","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pause","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"paused","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pausers","outputs":[{"internalType":"address[]","name":"","type":"address[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"permit","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"renounceRole","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"contract IERC20","name":"tokenContract","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"rescueERC20","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"rescuers","outputs":[{"internalType":"address[]","name":"","type":"address[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"revokeRole","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"from","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"transferWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"unBlacklist","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"unpause","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"string","name":"newName","type":"string"},{"internalType":"string","name":"newSymbol","type":"string"}],"name":"updateMetadata","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"withdraw","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"withdrawWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"}]"""
+ERC1155_SET_APPROVAL_ABI = """[{"inputs": [{ "internalType": "address", "name": "operator", "type": "address" },{ "internalType": "bool", "name": "approved", "type": "bool" }],"name": "setApprovalForAll","outputs": [],"stateMutability": "nonpayable","type": "function"}]"""
+
+
+@lru_cache(maxsize=None)
+def parse_abi(abi_json: str) -> list:
+    return json.loads(abi_json)
+
+
+@lru_cache(maxsize=None)
+def web3_for(rpc_urls: "tuple[str, ...]"):
+    """One Web3 client per RPC endpoint pool per process."""
+    # web3 is imported lazily: it dominates import time for every CLI command
+    from web3 import Web3
+    from web3.middleware import geth_poa_middleware
+
+    from agents.utils.rpc_pool import RpcPoolProvider
+
+    web3 = Web3(RpcPoolProvider(list(rpc_urls)))
+    web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+    return web3
+
+
+def _load_cached_creds(cache_key: str):
+    try:
+        with open(CLOB_CREDS_PATH, "r") as f:
+            entry = json.load(f).get(cache_key)
+    except Exception:
+        return None
+    fields = ("api_key", "api_secret", "api_passphrase")
+    if not isinstance(entry, dict) or not all(
+        isinstance(entry.get(k), str) and entry.get(k) for k in fields
+    ):
+        # missing or malformed: derive fresh creds and overwrite this entry
+        return None
+    return ApiCreds(**{k: entry[k] for k in fields})
+
+
+def _save_cached_creds(cache_key: str, creds: ApiCreds) -> None:
+    try:
+        with open(CLOB_CREDS_PATH, "r") as f:
+            cached = json.load(f)
+    except Exception:
+        cached = {}
+    cached[cache_key] = {
+        "api_key": creds.api_key,
+        "api_secret": creds.api_secret,
+        "api_passphrase": creds.api_passphrase,
+    }
+    parent = os.path.dirname(CLOB_CREDS_PATH)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # API secrets: owner read/write only
+    fd = os.open(CLOB_CREDS_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(cached, f)
+
+
+# Shared by every Polymarket instance so the trader, bot and monitor running
+# in one process coalesce concurrent balance reads for the same wallet.
+_balance_flight = SingleFlight()
+
 
 class Polymarket:
     def __init__(self) -> None:
         self.gamma_url = "https://gamma-api.polymarket.com"
         self.gamma_markets_endpoint = self.gamma_url + "/markets"
         self.gamma_events_endpoint = self.gamma_url + "/events"
+        self.cache = get_response_cache()
+        self.gamma = GammaMarketClient()
 
         self.clob_url = "https://clob.polymarket.com"
         self.clob_auth_endpoint = self.clob_url + "/auth/api-key"
+        self.clob_max_concurrency = int(os.getenv("CLOB_MAX_CONCURRENCY", "8"))
 
         self.chain_id = 137  # POLYGON
         self.private_key = os.getenv("POLYGON_WALLET_PRIVATE_KEY")
-        self.polygon_rpc = "https://polygon-rpc.com"
-        self.w3 = Web3(Web3.HTTPProvider(self.polygon_rpc))
+        # comma-separated; reads are hedged and failed over across the pool
+        self.polygon_rpc_urls = [
+            url.strip()
+            for url in os.getenv("POLYGON_RPC_URLS", "https://polygon-rpc.com").split(",")
+            if url.strip()
+        ]
+        self.polygon_rpc = self.polygon_rpc_urls[0]
 
         self.exchange_address = "0x4bfb41d5b3570defd03c39a9a4d8de6bd8b8982e"
         self.neg_risk_exchange_address = "0xC5d563A36AE78145C45a50134d48A1215220f80a"
+        self.neg_risk_adapter_address = "0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296"
+        # contracts that need USDC allowance and CTF operator approval to trade
+        self.exchange_spenders = [
+            self.exchange_address,
+            self.neg_risk_exchange_address,
+            self.neg_risk_adapter_address,
+        ]
 
-        self.erc20_approve = """[{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"owner","type":"address"},{"indexed":true,"internalType":"address","name":"spender","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"authorizer","type":"address"},{"indexed":true,"internalType":"bytes32","name":"nonce","type":"bytes32"}],"name":"AuthorizationCanceled","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"authorizer","type":"address"},{"indexed":true,"internalType":"bytes32","name":"nonce","type":"bytes32"}],"name":"AuthorizationUsed","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"Blacklisted","type":"event"},{"anonymous":false,"inputs":[{"indexed":false,"internalType":"address","name":"userAddress","type":"address"},{"indexed":false,"internalType":"address payable","name":"relayerAddress","type":"address"},{"indexed":false,"internalType":"bytes","name":"functionSignature","type":"bytes"}],"name":"MetaTransactionExecuted","type":"event"},{"anonymous":false,"inputs":[],"name":"Pause","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"newRescuer","type":"address"}],"name":"RescuerChanged","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"bytes32","name":"role","type":"bytes32"},{"indexed":true,"internalType":"bytes32","name":"previousAdminRole","type":"bytes32"},{"indexed":true,"internalType":"bytes32","name":"newAdminRole","type":"bytes32"}],"name":"RoleAdminChanged","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"bytes32","name":"role","type":"bytes32"},{"indexed":true,"internalType":"address","name":"account","type":"address"},{"indexed":true,"internalType":"address","name":"sender","type":"address"}],"name":"RoleGranted","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"bytes32","name":"role","type":"bytes32"},{"indexed":true,"internalType":"address","name":"account","type":"address"},{"indexed":true,"internalType":"address","name":"sender","type":"address"}],"name":"RoleRevoked","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"from","type":"address"},{"indexed":true,"internalType":"address","name":"to","type":"address"},{"indexed":false,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"anonymous":false,"inputs":[{"indexed":true,"internalType":"address","name":"account","type":"address"}],"name":"UnBlacklisted","type":"event"},{"anonymous":false,"inputs":[],"name":"Unpause","type":"event"},{"inputs":[],"name":"APPROVE_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"BLACKLISTER_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"CANCEL_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DECREASE_ALLOWANCE_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DEFAULT_ADMIN_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DEPOSITOR_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"DOMAIN_SEPARATOR","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"EIP712_VERSION","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"INCREASE_ALLOWANCE_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"META_TRANSACTION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"PAUSER_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"PERMIT_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"RESCUER_ROLE","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"TRANSFER_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"WITHDRAW_WITH_AUTHORIZATION_TYPEHASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"approveWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"authorizer","type":"address"},{"internalType":"bytes32","name":"nonce","type":"bytes32"}],"name":"authorizationState","outputs":[{"internalType":"enum GasAbstraction.AuthorizationState","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"blacklist","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"blacklisters","outputs":[{"internalType":"address[]","name":"","type":"address[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"authorizer","type":"address"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"cancelAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"subtractedValue","type":"uint256"}],"name":"decreaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"decrement","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"decreaseAllowanceWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"user","type":"address"},{"internalType":"bytes","name":"depositData","type":"bytes"}],"name":"deposit","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"userAddress","type":"address"},{"internalType":"bytes","name":"functionSignature","type":"bytes"},{"internalType":"bytes32","name":"sigR","type":"bytes32"},{"internalType":"bytes32","name":"sigS","type":"bytes32"},{"internalType":"uint8","name":"sigV","type":"uint8"}],"name":"executeMetaTransaction","outputs":[{"internalType":"bytes","name":"","type":"bytes"}],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"}],"name":"getRoleAdmin","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"uint256","name":"index","type":"uint256"}],"name":"getRoleMember","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"}],"name":"getRoleMemberCount","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"grantRole","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"hasRole","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"addedValue","type":"uint256"}],"name":"increaseAllowance","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"increment","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"increaseAllowanceWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"string","name":"newName","type":"string"},{"internalType":"string","name":"newSymbol","type":"string"},{"internalType":"uint8","name":"newDecimals","type":"uint8"},{"internalType":"address","name":"childChainManager","type":"address"}],"name":"initialize","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"initialized","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"isBlacklisted","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"}],"name":"nonces","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pause","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"paused","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pausers","outputs":[{"internalType":"address[]","name":"","type":"address[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"permit","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"renounceRole","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"contract IERC20","name":"tokenContract","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"rescueERC20","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"rescuers","outputs":[{"internalType":"address[]","name":"","type":"address[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"role","type":"bytes32"},{"internalType":"address","name":"account","type":"address"}],"name":"revokeRole","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"from","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"transferWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"unBlacklist","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"unpause","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"string","name":"newName","type":"string"},{"internalType":"string","name":"newSymbol","type":"string"}],"name":"updateMetadata","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"withdraw","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"validAfter","type":"uint256"},{"internalType":"uint256","name":"validBefore","type":"uint256"},{"internalType":"bytes32","name":"nonce","type":"bytes32"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"withdrawWithAuthorization","outputs":[],"stateMutability":"nonpayable","type":"function"}]"""
-        self.erc1155_set_approval = """[{"inputs": [{ "internalType": "address", "name": "operator", "type": "address" },{ "internalType": "bool", "name": "approved", "type": "bool" }],"name": "setApprovalForAll","outputs": [],"stateMutability": "nonpayable","type": "function"}]"""
+        self.erc20_approve = ERC20_APPROVE_ABI
+        self.erc1155_set_approval = ERC1155_SET_APPROVAL_ABI
 
         self.usdc_address = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
         self.ctf_address = "0x4D97DCd97eC945f40cF65F87097ACe5EA0476045"
 
-        self.web3 = Web3(Web3.HTTPProvider(self.polygon_rpc))
-        self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-
-        self.usdc = self.web3.eth.contract(
-            address=self.usdc_address, abi=self.erc20_approve
-        )
-        self.ctf = self.web3.eth.contract(
-            address=self.ctf_address, abi=self.erc1155_set_approval
-        )
-
-        self._init_api_keys()
+        # CLOB credentials, Web3 and contracts are created on first use so
+        # commands that never touch them (--help, positions, ...) start fast.
         self._init_approvals(False)
         self.notifier = TelegramNotifier()
 
-    def _init_api_keys(self) -> None:
-        self.client = ClobClient(
-            self.clob_url, key=self.private_key, chain_id=self.chain_id
-        )
-        self.credentials = self.client.create_or_derive_api_creds()
-        self.client.set_api_creds(self.credentials)
-        # print(self.credentials)
+    @cached_property
+    def web3(self):
+        return web3_for(tuple(self.polygon_rpc_urls))
 
-    def _init_approvals(self, run: bool = False) -> None:
-        if not run:
-            return
+    @property
+    def w3(self):
+        return self.web3
 
-        priv_key = self.private_key
-        pub_key = self.get_address_for_private_key()
-        chain_id = self.chain_id
-        web3 = self.web3
-        nonce = web3.eth.get_transaction_count(pub_key)
-        usdc = self.usdc
-        ctf = self.ctf
-
-        # CTF Exchange
-        raw_usdc_approve_txn = usdc.functions.approve(
-            "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E", int(MAX_INT, 0)
-        ).build_transaction({"chainId": chain_id, "from": pub_key, "nonce": nonce})
-        signed_usdc_approve_tx = web3.eth.account.sign_transaction(
-            raw_usdc_approve_txn, private_key=priv_key
-        )
-        send_usdc_approve_tx = web3.eth.send_raw_transaction(
-            signed_usdc_approve_tx.raw_transaction
-        )
-        usdc_approve_tx_receipt = web3.eth.wait_for_transaction_receipt(
-            send_usdc_approve_tx, 600
+    @cached_property
+    def usdc(self):
+        return self.web3.eth.contract(
+            address=self.usdc_address, abi=parse_abi(self.erc20_approve)
         )
-        print(usdc_approve_tx_receipt)
 
-        nonce = web3.eth.get_transaction_count(pub_key)
-
-        raw_ctf_approval_txn = ctf.functions.setApprovalForAll(
-            "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E", True
-        ).build_transaction({"chainId": chain_id, "from": pub_key, "nonce": nonce})
-        signed_ctf_approval_tx = web3.eth.account.sign_transaction(
-            raw_ctf_approval_txn, private_key=priv_key
-        )
-        send_ctf_approval_tx = web3.eth.send_raw_transaction(
-            signed_ctf_approval_tx.raw_transaction
+    @cached_property
+    def ctf(self):
+        return self.web3.eth.contract(
+            address=self.ctf_address, abi=parse_abi(self.erc1155_set_approval)
         )
-        ctf_approval_tx_receipt = web3.eth.wait_for_transaction_receipt(
-            send_ctf_approval_tx, 600
-        )
-        print(ctf_approval_tx_receipt)
-
-        nonce = web3.eth.get_transaction_count(pub_key)
 
-        # Neg Risk CTF Exchange
-        raw_usdc_approve_txn = usdc.functions.approve(
-            "0xC5d563A36AE78145C45a50134d48A1215220f80a", int(MAX_INT, 0)
-        ).build_transaction({"chainId": chain_id, "from": pub_key, "nonce": nonce})
-        signed_usdc_approve_tx = web3.eth.account.sign_transaction(
-            raw_usdc_approve_txn, private_key=priv_key
+    @cached_property
+    def client(self) -> ClobClient:
+        transport.install_clob_transport()
+        client = ClobClient(self.clob_url, key=self.private_key, chain_id=self.chain_id)
+        if self.private_key:
+            client.set_api_creds(self._get_api_creds(client))
+        return client
+
+    @cached_property
+    def signing(self) -> SigningContext:
+        return SigningContext(self.private_key, self.exchange_address, self.chain_id)
+
+    @cached_property
+    def chain(self) -> ChainReader:
+        return ChainReader(self.web3, self.usdc_address, self.ctf_address)
+
+    @cached_property
+    def orders(self) -> OrderEngine:
+        return OrderEngine(
+            self.client,
+            self.notifier,
+            max_workers=self.clob_max_concurrency,
+            # cached creds the CLOB rejects are re-derived and the post retried
+            on_unauthorized=self.refresh_api_creds,
         )
-        send_usdc_approve_tx = web3.eth.send_raw_transaction(
-            signed_usdc_approve_tx.raw_transaction
-        )
-        usdc_approve_tx_receipt = web3.eth.wait_for_transaction_receipt(
-            send_usdc_approve_tx, 600
-        )
-        print(usdc_approve_tx_receipt)
-
-        nonce = web3.eth.get_transaction_count(pub_key)
 
-        raw_ctf_approval_txn = ctf.functions.setApprovalForAll(
-            "0xC5d563A36AE78145C45a50134d48A1215220f80a", True
-        ).build_transaction({"chainId": chain_id, "from": pub_key, "nonce": nonce})
-        signed_ctf_approval_tx = web3.eth.account.sign_transaction(
-            raw_ctf_approval_txn, private_key=priv_key
+    @cached_property
+    def orderbooks(self) -> OrderBookMirror:
+        return OrderBookMirror(
+            fetch_books=lambda token_ids: fetch_books(token_ids, self.clob_url)
         )
-        send_ctf_approval_tx = web3.eth.send_raw_transaction(
-            signed_ctf_approval_tx.raw_transaction
-        )
-        ctf_approval_tx_receipt = web3.eth.wait_for_transaction_receipt(
-            send_ctf_approval_tx, 600
-        )
-        print(ctf_approval_tx_receipt)
 
-        nonce = web3.eth.get_transaction_count(pub_key)
+    @property
+    def credentials(self) -> ApiCreds:
+        return self.client.creds
+
+    def _creds_cache_key(self) -> str:
+        return f"{self.get_address_for_private_key()}@{self.clob_url}#{self.chain_id}"
+
+    def _get_api_creds(self, client: ClobClient) -> ApiCreds:
+        """Reuse locally cached API creds, deriving and caching them on a miss."""
+        cache_key = self._creds_cache_key()
+        creds = _load_cached_creds(cache_key)
+        if creds is None:
+            creds = client.create_or_derive_api_creds()
+            _save_cached_creds(cache_key, creds)
+        return creds
+
+    def refresh_api_creds(self) -> ApiCreds:
+        """Re-derive API creds, e.g. after a key rotation, and update the cache."""
+        creds = self.client.create_or_derive_api_creds()
+        _save_cached_creds(self._creds_cache_key(), creds)
+        self.client.set_api_creds(creds)
+        return creds
 
-        # Neg Risk Adapter
-        raw_usdc_approve_txn = usdc.functions.approve(
-            "0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296", int(MAX_INT, 0)
-        ).build_transaction({"chainId": chain_id, "from": pub_key, "nonce": nonce})
-        signed_usdc_approve_tx = web3.eth.account.sign_transaction(
-            raw_usdc_approve_txn, private_key=priv_key
-        )
-        send_usdc_approve_tx = web3.eth.send_raw_transaction(
-            signed_usdc_approve_tx.raw_transaction
-        )
-        usdc_approve_tx_receipt = web3.eth.wait_for_transaction_receipt(
-            send_usdc_approve_tx, 600
-        )
-        print(usdc_approve_tx_receipt)
+    def _init_approvals(self, run: bool = False) -> None:
+        if not run:
+            return
 
-        nonce = web3.eth.get_transaction_count(pub_key)
+        from web3.constants import MAX_INT
+
+        max_allowance = int(MAX_INT, 0)
+        # skip approvals a previous run already set, read in one multicall
+        snapshot = self.get_wallet_snapshot()
+        calls = []
+        for spender in self.exchange_spenders:
+            spender = to_checksum_address(spender)
+            if snapshot.allowances[spender] < max_allowance // 2:
+                calls.append(self.usdc.functions.approve(spender, max_allowance))
+            if not snapshot.ctf_approvals[spender]:
+                calls.append(self.ctf.functions.setApprovalForAll(spender, True))
+        if not calls:
+            print("All exchange approvals already set")
+            return
 
-        raw_ctf_approval_txn = ctf.functions.setApprovalForAll(
-            "0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296", True
-        ).build_transaction({"chainId": chain_id, "from": pub_key, "nonce": nonce})
-        signed_ctf_approval_tx = web3.eth.account.sign_transaction(
-            raw_ctf_approval_txn, private_key=priv_key
-        )
-        send_ctf_approval_tx = web3.eth.send_raw_transaction(
-            signed_ctf_approval_tx.raw_transaction
-        )
-        ctf_approval_tx_receipt = web3.eth.wait_for_transaction_receipt(
-            send_ctf_approval_tx, 600
+        pipeline = TxPipeline(
+            self.web3,
+            self.private_key,
+            self.get_address_for_private_key(),
+            self.chain_id,
         )
-        print(ctf_approval_tx_receipt)
+        for receipt in pipeline.run(calls):
+            print(receipt)
 
     def get_all_markets(self) -> "list[SimpleMarket]":
         markets = []
-        res = httpx.get(self.gamma_markets_endpoint)
+        res = transport.get(self.gamma_markets_endpoint)
         if res.status_code == 200:
             for market in res.json():
                 try:
@@ -203,6 +270,10 @@ class Polymarket:
                     pass
         return markets
 
+    def get_market_table(self) -> MarketTable:
+        """Columnar snapshot of every active market, for vectorized screening."""
+        return MarketTable(self.gamma.iter_all_current_markets())
+
     def filter_markets_for_trading(self, markets: "list[SimpleMarket]"):
         tradeable_markets = []
         for market in markets:
@@ -212,7 +283,7 @@ class Polymarket:
 
     def get_market(self, token_id: str) -> SimpleMarket:
         params = {"clob_token_ids": token_id}
-        res = httpx.get(self.gamma_markets_endpoint, params=params)
+        res = self.cache.get(self.gamma_markets_endpoint, params=params)
         if res.status_code == 200:
             data = res.json()
             market = data[0]
@@ -241,7 +312,7 @@ class Polymarket:
 
     def get_all_events(self) -> "list[SimpleEvent]":
         events = []
-        res = httpx.get(self.gamma_events_endpoint)
+        res = transport.get(self.gamma_events_endpoint)
         if res.status_code == 200:
             print(len(res.json()))
             for event in res.json():
@@ -291,97 +362,160 @@ class Polymarket:
         return self.filter_events_for_trading(all_events)
 
     def get_sampling_simplified_markets(self) -> "list[SimpleEvent]":
-        markets = []
         raw_sampling_simplified_markets = self.client.get_sampling_simplified_markets()
-        for raw_market in raw_sampling_simplified_markets["data"]:
-            token_one_id = raw_market["tokens"][0]["token_id"]
-            market = self.get_market(token_one_id)
-            markets.append(market)
-        return markets
+        token_ids = [
+            raw_market["tokens"][0]["token_id"]
+            for raw_market in raw_sampling_simplified_markets["data"]
+        ]
+        markets_by_token = self.gamma.get_markets_by_token_ids(token_ids)
+        return [
+            self.map_api_to_market(market, token_id)
+            for token_id, market in markets_by_token.items()
+        ]
 
     def get_orderbook(self, token_id: str) -> OrderBookSummary:
         return self.client.get_order_book(token_id)
 
-    def get_orderbook_price(self, token_id: str) -> float:
-        return float(self.client.get_price(token_id))
+    def get_orderbook_price(self, token_id: str, max_age: float = 10.0) -> float:
+        # served from the local mirror when it holds a fresh book for the token
+        if self.orderbooks.is_fresh(token_id, max_age):
+            mid = self.orderbooks.mid(token_id)
+            if mid is not None:
+                return mid
+        return float(self.client.get_midpoint(token_id)["mid"])
+
+    def get_prices(
+        self, token_ids: "list[str]", side: str = "BUY", max_workers: int = None
+    ) -> BulkResult:
+        """
+        Prices for many tokens via the CLOB ``/prices`` batch endpoint, with a
+        concurrent per-token fallback. ``.aligned(token_ids)`` gives a list in
+        input order; tokens that could not be priced are listed in ``.errors``.
+        """
+
+        def fetch_batch(batch):
+            prices = self.client.get_prices([BookParams(t, side) for t in batch])
+            return {t: float(p[side]) for t, p in prices.items() if side in p}
+
+        return bulk_fetch(
+            token_ids,
+            fetch_batch,
+            lambda t: float(self.client.get_price(t, side)["price"]),
+            max_workers=max_workers or self.clob_max_concurrency,
+        )
+
+    def get_orderbooks(
+        self, token_ids: "list[str]", max_workers: int = None
+    ) -> BulkResult:
+        """Order books for many tokens via ``/books``, with the same fallback."""
+
+        def fetch_batch(batch):
+            books = self.client.get_order_books([BookParams(t) for t in batch])
+            return {book.asset_id: book for book in books}
+
+        return bulk_fetch(
+            token_ids,
+            fetch_batch,
+            self.client.get_order_book,
+            max_workers=max_workers or self.clob_max_concurrency,
+        )
+
+    def watch_orderbooks(self, token_ids: "list[str]") -> OrderBookMirror:
+        """Mirror these tokens' books locally, starting the feed on first use."""
+        self.orderbooks.track(token_ids)
+        return self.orderbooks.start()
 
     def get_address_for_private_key(self):
-        account = self.w3.eth.account.from_key(str(self.private_key))
-        return account.address
+        return self.signing.address
 
     def build_order(
         self,
         market_token: str,
         amount: float,
-        nonce: str = str(round(time.time())),  # for cancellations
+        nonce: str = None,  # for cancellations; defaults to the current time
         side: str = "BUY",
         expiration: str = "0",  # timestamp after which order expires
-    ):
-        signer = Signer(self.private_key)
-        builder = OrderBuilder(self.exchange_address, self.chain_id, signer)
-
-        buy = side == "BUY"
-        side = 0 if buy else 1
-        maker_amount = amount if buy else 0
-        taker_amount = amount if not buy else 0
-        order_data = OrderData(
-            maker=self.get_address_for_private_key(),
-            tokenId=market_token,
-            makerAmount=maker_amount,
-            takerAmount=taker_amount,
-            feeRateBps="1",
-            nonce=nonce,
-            side=side,
-            expiration=expiration,
+    ) -> SignedOrder:
+        return self.signing.sign(
+            OrderRequest(market_token, amount, nonce, side, expiration)
         )
-        order = builder.build_signed_order(order_data)
-        return order
+
+    def build_orders(
+        self, batch: "list[OrderRequest]", processes: int = None
+    ) -> "list[SignedOrder]":
+        """
+        Sign a batch of orders with the wallet's signing context. Pass
+        ``processes`` to spread large batches across a process pool.
+        """
+        return self.signing.sign_many(batch, processes=processes)
 
     def execute_order(self, price, size, side, token_id) -> str:
-        return self.client.create_and_post_order(
-            OrderArgs(price=price, size=size, side=side, token_id=token_id)
-        )
+        ticket = OrderTicket(token_id=token_id, side=side, price=price, size=size)
+        return self._submit_one(ticket)
 
-    def execute_market_order(self, market, amount) -> str:
-        token_id = ast.literal_eval(market[0].dict()["metadata"]["clob_token_ids"])[1]
+    def execute_market_order(self, market, amount, outcome_index: int = 1) -> str:
+        token_id = ast.literal_eval(market[0].dict()["metadata"]["clob_token_ids"])[outcome_index]
         market_question = "Unknown Market"
         try:
             market_question = market[0].dict()["metadata"].get("question", "Unknown Market")
         except Exception:
             pass
 
-        order_args = MarketOrderArgs(
+        # journaled for /positions and result monitoring, and announced on
+        # Telegram, in the background once the order is accepted
+        ticket = OrderTicket(
             token_id=token_id,
             amount=amount,
+            order_type=OrderType.FOK,
+            market_question=market_question,
+            journal=True,
         )
-        signed_order = self.client.create_market_order(order_args)
-        print("Execute market order... signed_order ", signed_order)
-        resp = self.client.post_order(signed_order, orderType=OrderType.FOK)
-        print(resp)
-        print("Done!")
-
-        # Persist trade journal entry for /positions and result monitoring
-        trade_id = str(uuid.uuid4())
-        add_trade(
-            {
-                "id": trade_id,
-                "market_question": market_question,
-                "token_id": token_id,
-                "amount_usdc": float(amount),
-                "raw_response": str(resp),
-            }
-        )
+        resp = self._submit_one(ticket)
+        print("Execute market order... ", resp, ticket.latency_ms())
+        return resp
 
-        # Send Telegram trade-taken update if configured
-        self.notifier.send(self.notifier.fmt_trade_taken(market_question, token_id, float(amount)))
+    def _submit_one(self, ticket: OrderTicket):
+        (ticket,) = self.orders.submit([ticket])
+        if ticket.error:
+            raise RuntimeError(ticket.error)
+        return ticket.response
+
+    def execute_orders(
+        self, tickets: "list[OrderTicket]", cancel_order_ids: "list[str]" = ()
+    ) -> "list[OrderTicket]":
+        """
+        Sign and post many orders concurrently, optionally cancelling
+        ``cancel_order_ids`` first (cancel/replace). Per-order outcomes are on
+        each ticket's ``response``/``error``.
+        """
+        return self.orders.submit(tickets, cancel_order_ids)
+
+    def close(self) -> None:
+        """Flush pending order journal writes and stop background workers."""
+        # only what was actually created; cached_property stores in __dict__
+        if "orders" in self.__dict__:
+            self.orders.close()
+        if "orderbooks" in self.__dict__:
+            self.orderbooks.stop(timeout=5)
+
+    def get_wallet_snapshot(self, token_ids: "list[str]" = ()) -> WalletSnapshot:
+        """
+        USDC balance, exchange allowances/approvals and CTF balances for
+        ``token_ids`` in one multicall, cached per block.
+        """
+        return self.chain.wallet_snapshot(
+            self.get_address_for_private_key(), self.exchange_spenders, token_ids
+        )
 
-        return resp
+    def get_position_balances(self, token_ids: "list[str]") -> "dict[str, float]":
+        return self.get_wallet_snapshot(token_ids).positions
 
     def get_usdc_balance(self) -> float:
-        balance_res = self.usdc.functions.balanceOf(
-            self.get_address_for_private_key()
-        ).call()
-        return float(balance_res / 10e5)
+        address = self.get_address_for_private_key()
+        snapshot = _balance_flight.do(
+            address, self.chain.wallet_snapshot, address, self.exchange_spenders
+        )
+        return snapshot.usdc_balance
 
     def get_open_positions(self):
         """Returns locally tracked open trades from the trade journal."""
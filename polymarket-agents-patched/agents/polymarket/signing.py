@@ -0,0 +1,104 @@
+"""
+Order signing for a single wallet.
+
+Building a ``Signer`` re-derives the account from the private key, building
+an ``OrderBuilder`` recomputes the EIP-712 domain separator, and
+``Signer.sign`` re-parses the key (a public key derivation) on every
+signature. A ``SigningContext`` does all three once per wallet and reuses
+them for every order.
+
+Large batches can be signed across a process pool; each worker builds its own
+context once in its initializer.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from eth_account import Account
+from eth_keys import keys
+from py_order_utils.builders import OrderBuilder
+from py_order_utils.model import OrderData, SignedOrder
+from py_order_utils.signer import Signer
+
+# Below this many orders a process pool costs more than it saves
+PROCESS_POOL_MIN_BATCH = int(os.getenv("POLYAI_SIGNING_POOL_MIN_BATCH", "256"))
+
+
+class ParsedKeySigner(Signer):
+    """``Signer`` that parses the private key once instead of per signature."""
+
+    def __init__(self, key: str):
+        super().__init__(key)
+        self._key_obj = keys.PrivateKey(bytes(self.account.key))
+
+    def sign(self, struct_hash) -> str:
+        return Account._sign_hash(struct_hash, self._key_obj).signature.hex()
+
+
+@dataclass
+class OrderRequest:
+    market_token: str
+    amount: float
+    nonce: Optional[str] = None  # for cancellations; defaults to the current time
+    side: str = "BUY"
+    expiration: str = "0"  # timestamp after which order expires
+
+
+class SigningContext:
+    def __init__(self, private_key: str, exchange_address: str, chain_id: int) -> None:
+        self.private_key = private_key
+        self.exchange_address = exchange_address
+        self.chain_id = chain_id
+        self.signer = ParsedKeySigner(private_key)
+        self.address = self.signer.address()
+        self.builder = OrderBuilder(exchange_address, chain_id, self.signer)
+
+    def order_data(self, request: OrderRequest) -> OrderData:
+        buy = request.side == "BUY"
+        return OrderData(
+            maker=self.address,
+            tokenId=request.market_token,
+            makerAmount=request.amount if buy else 0,
+            takerAmount=request.amount if not buy else 0,
+            feeRateBps="1",
+            nonce=request.nonce or str(round(time.time())),
+            side=0 if buy else 1,
+            expiration=request.expiration,
+        )
+
+    def sign(self, request: OrderRequest) -> SignedOrder:
+        return self.builder.build_signed_order(self.order_data(request))
+
+    def sign_many(
+        self, requests: "Iterable[OrderRequest]", processes: Optional[int] = None
+    ) -> List[SignedOrder]:
+        """
+        Sign a batch of orders, preserving order. With ``processes`` set and a
+        batch of at least ``PROCESS_POOL_MIN_BATCH`` orders, signing is spread
+        across that many worker processes.
+        """
+        requests = list(requests)
+        if not processes or processes <= 1 or len(requests) < PROCESS_POOL_MIN_BATCH:
+            return [self.sign(request) for request in requests]
+        chunksize = max(1, len(requests) // (processes * 4))
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(self.private_key, self.exchange_address, self.chain_id),
+        ) as pool:
+            return list(pool.map(_sign_in_worker, requests, chunksize=chunksize))
+
+
+_worker_context: Optional[SigningContext] = None
+
+
+def _init_worker(private_key: str, exchange_address: str, chain_id: int) -> None:
+    global _worker_context
+    _worker_context = SigningContext(private_key, exchange_address, chain_id)
+
+
+def _sign_in_worker(request: OrderRequest) -> SignedOrder:
+    return _worker_context.sign(request)
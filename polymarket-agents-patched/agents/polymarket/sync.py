@@ -0,0 +1,178 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+from dateutil.parser import isoparse
+from pydantic import BaseModel
+
+from agents.polymarket.gamma import GammaMarketClient
+
+MARKET_TABLE_PATH = os.getenv("POLYAI_MARKET_TABLE_PATH", "data/market_table.json")
+
+
+class MarketDelta(BaseModel):
+    added: List[dict] = []
+    changed: List[dict] = []
+    removed: List[str] = []
+    high_water_mark: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+def _is_tradeable(market: dict) -> bool:
+    return (
+        bool(market.get("active"))
+        and not market.get("closed")
+        and not market.get("archived")
+    )
+
+
+class MarketSync:
+    """
+    Keeps a local table of active Gamma markets in step with upstream.
+
+    The first run pulls the full active universe. Later runs page through
+    markets ordered by ``updatedAt`` (newest first) and stop at the stored
+    high-water mark, so only markets touched since the previous sync are
+    downloaded. Sync pages bypass the response cache, which would otherwise
+    hide updates made within its TTL. Markets without ``updatedAt`` are
+    skipped. Closed or archived markets are dropped from the table. If the
+    delta does not reach the mark within ``max_pages``, the table is rebuilt
+    with a full sync rather than skipping the markets in between.
+    """
+
+    def __init__(
+        self,
+        gamma: Optional[GammaMarketClient] = None,
+        path: str = MARKET_TABLE_PATH,
+        page_size: int = 100,
+        max_pages: int = 500,
+    ) -> None:
+        self.gamma = gamma or GammaMarketClient()
+        self.path = path
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.high_water_mark: Optional[str] = None
+        self.markets: Dict[str, dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        except Exception:
+            state = {}
+        self.high_water_mark = state.get("high_water_mark")
+        self.markets = state.get("markets", {})
+
+    def save(self) -> None:
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"high_water_mark": self.high_water_mark, "markets": self.markets}, f
+            )
+        os.replace(tmp_path, self.path)
+
+    def sync(self) -> MarketDelta:
+        if self.high_water_mark is None:
+            delta = self._full_sync()
+        else:
+            delta = self._delta_sync()
+        self.high_water_mark = delta.high_water_mark
+        self.save()
+        return delta
+
+    def _full_sync(self) -> MarketDelta:
+        delta = MarketDelta()
+        # diffed against the current table, which is empty on the first run
+        previous, self.markets = self.markets, {}
+        for market in self.gamma.get_all_current_markets(
+            limit=self.page_size, use_cache=False
+        ):
+            market_id = str(market["id"])
+            self.markets[market_id] = market
+            existing = previous.get(market_id)
+            if existing is None:
+                delta.added.append(market)
+            elif existing.get("updatedAt") != market.get("updatedAt"):
+                delta.changed.append(market)
+        delta.removed = [i for i in previous if i not in self.markets]
+        delta.high_water_mark = self._latest_update(self.markets.values())
+        return delta
+
+    def _delta_sync(self) -> MarketDelta:
+        delta = MarketDelta(high_water_mark=self.high_water_mark)
+        mark = isoparse(self.high_water_mark)
+        seen: Dict[str, dict] = {}
+        before = dict(self.markets)
+        complete = False
+        for page_number in range(self.max_pages):
+            page = self.gamma.get_markets(
+                querystring_params={
+                    "order": "updatedAt",
+                    "ascending": False,
+                    "limit": self.page_size,
+                    "offset": page_number * self.page_size,
+                },
+                use_cache=False,
+            )
+            reached_mark = False
+            for market in page:
+                updated_at = market.get("updatedAt")
+                if not updated_at:
+                    continue
+                # Markets updated at exactly the mark are re-checked because
+                # several can share a timestamp with the last one we stored.
+                if isoparse(updated_at) < mark:
+                    reached_mark = True
+                    break
+                market_id = str(market["id"])
+                if market_id in seen:
+                    continue
+                seen[market_id] = market
+                self._merge(market_id, market, delta)
+            if reached_mark or len(page) < self.page_size:
+                complete = True
+                break
+
+        if not complete:
+            print(
+                f"[MarketSync] delta sync did not reach {self.high_water_mark} "
+                f"within {self.max_pages} pages, running a full sync"
+            )
+            self.markets = before
+            return self._full_sync()
+
+        delta.high_water_mark = self._latest_update(
+            [*seen.values(), {"updatedAt": self.high_water_mark}]
+        )
+        return delta
+
+    def _merge(self, market_id: str, market: dict, delta: MarketDelta) -> None:
+        existing = self.markets.get(market_id)
+        if not _is_tradeable(market):
+            if existing is not None:
+                del self.markets[market_id]
+                delta.removed.append(market_id)
+            return
+        if existing is None:
+            delta.added.append(market)
+        elif existing.get("updatedAt") != market.get("updatedAt"):
+            delta.changed.append(market)
+        else:
+            return
+        self.markets[market_id] = market
+
+    @staticmethod
+    def _latest_update(markets) -> Optional[str]:
+        stamps = [m.get("updatedAt") for m in markets if m.get("updatedAt")]
+        if not stamps:
+            return None
+        return max(stamps, key=isoparse)
+
+    def get_markets(self) -> List[dict]:
+        return list(self.markets.values())
@@ -0,0 +1,127 @@
+"""
+Pipelined transaction submission for one wallet.
+
+Nonces are allocated locally, so a batch of transactions is signed and
+broadcast back to back without re-reading ``eth_getTransactionCount`` or
+waiting for each receipt. The receipts are then awaited concurrently. A
+batch therefore takes about one confirmation time, not one per transaction.
+If a broadcast fails partway through a batch, the transactions already sent
+are still awaited and reported on the raised ``PartialBroadcastError``.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+RECEIPT_TIMEOUT_SECONDS = 600
+
+
+class PartialBroadcastError(RuntimeError):
+    """A batch broadcast failed after ``tx_hashes`` were already sent."""
+
+    def __init__(
+        self,
+        tx_hashes: "List[bytes]",
+        receipts: "Optional[List[dict]]",
+        error: Exception,
+    ) -> None:
+        super().__init__(
+            f"broadcast failed after {len(tx_hashes)} transaction(s) were sent: {error}"
+        )
+        self.tx_hashes = tx_hashes
+        self.receipts = receipts  # None if waiting for them failed too
+        self.error = error
+
+
+class NonceManager:
+    def __init__(self, web3, address: str) -> None:
+        self.web3 = web3
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._next is None:
+                # "pending" counts our own transactions still in the mempool
+                self._next = self.web3.eth.get_transaction_count(
+                    self.address, "pending"
+                )
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def reset(self) -> None:
+        """Forget the local counter, e.g. after a failed broadcast left a gap."""
+        with self._lock:
+            self._next = None
+
+
+class TxPipeline:
+    def __init__(
+        self,
+        web3,
+        private_key: str,
+        address: str,
+        chain_id: int,
+        nonces: Optional[NonceManager] = None,
+        receipt_timeout: float = RECEIPT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.web3 = web3
+        self.private_key = private_key
+        self.address = address
+        self.chain_id = chain_id
+        self.nonces = nonces or NonceManager(web3, address)
+        self.receipt_timeout = receipt_timeout
+
+    def send(self, contract_call) -> bytes:
+        """Build, sign and broadcast a contract function call; returns its hash."""
+        nonce = self.nonces.allocate()
+        try:
+            txn = contract_call.build_transaction(
+                {"chainId": self.chain_id, "from": self.address, "nonce": nonce}
+            )
+            signed = self.web3.eth.account.sign_transaction(
+                txn, private_key=self.private_key
+            )
+            return self.web3.eth.send_raw_transaction(signed.raw_transaction)
+        except Exception:
+            # the nonce was never broadcast: resync from the node's pending count
+            self.nonces.reset()
+            raise
+
+    def wait(self, tx_hashes: "Iterable[bytes]") -> List[dict]:
+        tx_hashes = list(tx_hashes)
+        if not tx_hashes:
+            return []
+        with ThreadPoolExecutor(max_workers=len(tx_hashes)) as pool:
+            return list(
+                pool.map(
+                    lambda tx_hash: self.web3.eth.wait_for_transaction_receipt(
+                        tx_hash, self.receipt_timeout
+                    ),
+                    tx_hashes,
+                )
+            )
+
+    def run(self, contract_calls: Iterable) -> List[dict]:
+        """
+        Broadcast every call back to back, then wait for all receipts. If a
+        broadcast fails, the ones already sent are awaited before
+        ``PartialBroadcastError`` is raised with their hashes and receipts.
+        """
+        sent: List[bytes] = []
+        try:
+            for call in contract_calls:
+                sent.append(self.send(call))
+        except Exception as e:
+            self.nonces.reset()
+            try:
+                receipts = self.wait(sent)
+            except Exception as wait_error:
+                print(
+                    f"[warn] could not confirm {len(sent)} sent transactions: {wait_error}"
+                )
+                receipts = None
+            raise PartialBroadcastError(sent, receipts, e) from e
+        return self.wait(sent)
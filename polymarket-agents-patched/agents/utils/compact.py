@@ -0,0 +1,179 @@
+"""
+Compact rendering of Gamma markets and events for LLM prompts.
+
+``str()`` of a Gamma payload spends most of its tokens on quotes, braces,
+nulls, image URLs, timestamps and fields the model never uses. ``table``
+projects each item onto a fixed set of columns with short names and writes
+one CSV row per item under a one-line legend, leaving out columns that are
+empty in every row. Prices are rounded to the market's tick size when it is
+known (otherwise only float noise is trimmed), liquidity and volume to
+whole dollars, dates to the day.
+
+Items may be raw Gamma dicts, pydantic models, or ``(Document, score)``
+results from the vector store. Events and markets are told apart by their
+fields, so a list is rendered correctly whichever argument it was passed as.
+"""
+
+import ast
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# significant digits kept for prices whose tick size is unknown; enough for
+# a 0.001 tick without printing float noise such as 0.30000000000000004
+PRICE_DIGITS = 6
+
+# (column, source keys in order of preference, kind)
+MARKET_COLUMNS: "List[Tuple[str, Tuple[str, ...], str]]" = [
+    ("id", ("id",), "text"),
+    ("q", ("question",), "text"),
+    ("out", ("outcomes",), "list"),
+    ("px", ("outcomePrices", "outcome_prices"), "prices"),
+    ("liq", ("liquidity", "liquidityNum"), "usd"),
+    ("vol", ("volume", "volumeNum"), "usd"),
+    ("end", ("endDate", "end", "end_date_iso"), "date"),
+    ("desc", ("description", "page_content"), "text"),
+]
+EVENT_COLUMNS: "List[Tuple[str, Tuple[str, ...], str]]" = [
+    ("id", ("id",), "text"),
+    ("t", ("title",), "text"),
+    ("liq", ("liquidity",), "usd"),
+    ("vol", ("volume",), "usd"),
+    ("end", ("endDate",), "date"),
+    ("mkts", ("markets",), "ids"),
+    ("desc", ("description", "page_content"), "text"),
+]
+LEGEND = {
+    "id": "id",
+    "q": "question",
+    "t": "title",
+    "out": "outcomes",
+    "px": "outcome prices",
+    "liq": "liquidity USD",
+    "vol": "volume USD",
+    "end": "end date",
+    "mkts": "market ids",
+    "desc": "description",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def as_record(item: Any) -> Dict[str, Any]:
+    if isinstance(item, tuple):
+        # (Document, relevance score) from the vector store
+        item = item[0]
+    if isinstance(item, dict):
+        return item
+    if hasattr(item, "page_content"):
+        return dict(item.metadata, page_content=item.page_content)
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    if hasattr(item, "_asdict"):
+        return item._asdict()
+    return dict(item)
+
+
+def columns_for(record: Dict[str, Any]):
+    if "question" in record:
+        return MARKET_COLUMNS
+    if "title" in record or "markets" in record:
+        return EVENT_COLUMNS
+    return MARKET_COLUMNS
+
+
+def _as_list(value: Any) -> list:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return [value]
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def round_to_tick(price: float, tick: Optional[float] = None) -> str:
+    if not tick:
+        return f"{price:.{PRICE_DIGITS}g}"
+    decimals = max(0, len(f"{tick:g}".partition(".")[2]))
+    return f"{round(round(price / tick) * tick, decimals):g}"
+
+
+def _cell(value: Any, kind: str, tick: Optional[float]) -> str:
+    if value is None or value == "":
+        return ""
+    if kind == "text":
+        return _WHITESPACE.sub(" ", str(value)).strip()
+    if kind == "usd":
+        return str(round(float(value)))
+    if kind == "date":
+        return str(value)[:10]
+    if kind == "prices":
+        return "|".join(round_to_tick(float(p), tick) for p in _as_list(value))
+    if kind == "ids":
+        return "|".join(
+            str(m.get("id", "")) if isinstance(m, dict) else str(m)
+            for m in _as_list(value)
+        )
+    return "|".join(str(v) for v in _as_list(value))
+
+
+def _lookup(record: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _write(values: Sequence[str]) -> str:
+    out = io.StringIO()
+    csv.writer(out, lineterminator="").writerow(values)
+    return out.getvalue()
+
+
+def _cells(record: Dict[str, Any], columns, tick: Optional[float]) -> List[str]:
+    if not tick and record.get("orderPriceMinTickSize"):
+        tick = float(record["orderPriceMinTickSize"])
+    return [_cell(_lookup(record, keys), kind, tick) for _, keys, kind in columns]
+
+
+def row(item: Any, columns=None, tick: Optional[float] = None) -> str:
+    """One CSV row for ``item``; also what a chunk packer should measure."""
+    record = as_record(item)
+    return _write(_cells(record, columns or columns_for(record), tick))
+
+
+def heading(columns) -> str:
+    legend = ", ".join(
+        f"{name}={LEGEND[name]}" for name, _, _ in columns if name != LEGEND[name]
+    )
+    return f"({legend}; lists are |-separated)\n" + _write(
+        [name for name, _, _ in columns]
+    )
+
+
+def table(items: Sequence[Any], tick: Optional[float] = None) -> str:
+    if not items:
+        return "(none)"
+    records = [as_record(item) for item in items]
+    columns = columns_for(records[0])
+    cells = [_cells(record, columns, tick) for record in records]
+    # drop columns that are empty in every row
+    keep = [i for i in range(len(columns)) if any(r[i] for r in cells)]
+    rows = [_write([r[i] for i in keep]) for r in cells]
+    return "\n".join([heading([columns[i] for i in keep])] + rows)
+
+
+def outcome_quotes(
+    outcomes: Sequence[str], prices: Sequence[Any], tick: Optional[float] = None
+) -> str:
+    """``Yes 0.54 | No 0.46`` from parallel outcome and price lists."""
+    return " | ".join(
+        f"{outcome} {round_to_tick(float(price), tick)}"
+        for outcome, price in zip(_as_list(outcomes), _as_list(prices))
+    )
@@ -0,0 +1,234 @@
+"""
+Persistent GET response cache shared by every process on the host.
+
+Responses are stored in SQLite keyed by the canonical request URL (endpoint
+plus sorted query params). Each endpoint has its own freshness TTL; once an
+entry goes stale it is revalidated with ``If-None-Match`` /
+``If-Modified-Since`` when the upstream sent validators, so an unchanged
+payload costs a 304 instead of a full body. Total stored bytes are bounded
+and the least recently used entries are evicted first.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from agents.utils import transport
+from agents.utils.singleflight import SingleFlight
+
+CACHE_PATH = os.getenv("POLYAI_HTTP_CACHE_PATH", "data/http_cache.sqlite")
+CACHE_ENABLED = os.getenv("POLYAI_HTTP_CACHE", "1") != "0"
+CACHE_MAX_BYTES = int(os.getenv("POLYAI_HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Freshness per endpoint path prefix, in seconds. The longest matching prefix
+# wins; paths with no match are not cached.
+DEFAULT_TTLS = {
+    "/markets": 30,
+    "/events": 60,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = CACHE_MAX_BYTES,
+        enabled: bool = CACHE_ENABLED,
+    ) -> None:
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        self._flight = SingleFlight()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "evictions": 0,
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        path = urlsplit(url).path
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        if not matches:
+            return None
+        return self.ttls[max(matches, key=len)]
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[dict] = None) -> str:
+        items = sorted((params or {}).items())
+        canonical = str(httpx.Request("GET", url, params=items).url)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """
+        Drop-in replacement for ``transport.get`` that serves fresh entries
+        locally and revalidates stale ones. Identical requests issued while
+        one is already in flight share its response.
+        """
+        key = self.cache_key(url, params)
+        return self._flight.do(key, self._get, key, url, params)
+
+    def _get(self, key: str, url: str, params: Optional[dict]) -> httpx.Response:
+        ttl = self.ttl_for(url)
+        if not self.enabled or ttl is None:
+            return transport.get(url, params=params)
+
+        now = time.time()
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT body, content_type, etag, last_modified, stored_at "
+                    "FROM responses WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+
+        headers = {}
+        if row is not None:
+            body, content_type, etag, last_modified, stored_at = row
+            if now - stored_at < ttl:
+                self._touch(key, now)
+                self._count("hits")
+                return self._build_response(url, params, body, content_type)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = transport.get(url, params=params, headers=headers)
+        if response.status_code == 304 and row is not None:
+            self._touch(key, now, refreshed=True)
+            self._count("revalidated")
+            return self._build_response(url, params, body, content_type)
+
+        self._count("misses")
+        if response.status_code == 200:
+            self._store(key, url, response, now)
+        return response
+
+    def _build_response(self, url, params, body, content_type) -> httpx.Response:
+        headers = {"Content-Type": content_type} if content_type else {}
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=body,
+            request=httpx.Request("GET", url, params=params),
+        )
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _touch(self, key: str, now: float, refreshed: bool = False) -> None:
+        column = "stored_at = ?, accessed_at = ?" if refreshed else "accessed_at = ?"
+        args = (now, now, key) if refreshed else (now, key)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(f"UPDATE responses SET {column} WHERE key = ?", args)
+            conn.commit()
+
+    def _store(self, key: str, url: str, response: httpx.Response, now: float):
+        body = response.content
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, body, content_type, etag, last_modified, "
+                "stored_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    body,
+                    response.headers.get("content-type"),
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    now,
+                    now,
+                    len(body),
+                ),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        stats = dict(self._stats)
+        stats["coalesced"] = self._flight.stats()["coalesced"]
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide ``ResponseCache``, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
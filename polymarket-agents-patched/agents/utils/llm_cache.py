@@ -0,0 +1,266 @@
+"""
+Persistent cache for chat model completions.
+
+Entries are keyed by model name, temperature and a hash of the serialized
+messages, so a byte-identical prompt (the market did not change since the
+last run) is answered from SQLite instead of the API. Entries expire after a
+TTL, and total stored bytes are bounded with least-recently-used eviction.
+Each entry remembers the latency and token usage of the call that produced
+it, so ``stats()`` can report what the hits saved.
+
+``stream`` is served from the same cache: a hit arrives as one chunk. A
+miss is stored when the stream ends, or when the caller's ``until`` check
+says the text so far is a complete answer and generation stops there. A
+stream abandoned any other way is not stored, so no truncated answer is
+left behind.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from agents.utils.singleflight import SingleFlight
+
+LLM_CACHE_PATH = os.getenv("POLYAI_LLM_CACHE_PATH", "data/llm_cache.sqlite")
+LLM_CACHE_ENABLED = os.getenv("POLYAI_LLM_CACHE", "1") != "0"
+LLM_CACHE_TTL = float(os.getenv("POLYAI_LLM_CACHE_TTL", str(6 * 60 * 60)))
+LLM_CACHE_MAX_BYTES = int(
+    os.getenv("POLYAI_LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    latency REAL NOT NULL,
+    tokens INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completions_accessed_at ON completions (accessed_at);
+"""
+
+
+def serialize_messages(messages) -> str:
+    if isinstance(messages, str):
+        messages = [("human", messages)]
+    else:
+        messages = [
+            (m.type, m.content) if isinstance(m, BaseMessage) else tuple(m)
+            for m in messages
+        ]
+    return json.dumps(messages, ensure_ascii=False, separators=(",", ":"))
+
+
+def _total_tokens(message: Any) -> int:
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    metadata = getattr(message, "response_metadata", None) or {}
+    return int((metadata.get("token_usage") or {}).get("total_tokens") or 0)
+
+
+class CachedChatModel:
+    """
+    Wraps a LangChain chat model so ``invoke`` consults the cache first.
+    Everything else is delegated to the wrapped model.
+    """
+
+    def __init__(
+        self,
+        llm,
+        model: str,
+        path: str = LLM_CACHE_PATH,
+        ttl: float = LLM_CACHE_TTL,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ) -> None:
+        self.llm = llm
+        self.model = model
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        self._flight = SingleFlight()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "saved_seconds": 0.0,
+            "saved_tokens": 0,
+        }
+
+    def __getattr__(self, name: str):
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def cache_key(self, messages) -> str:
+        temperature = getattr(self.llm, "temperature", None)
+        canonical = f"{self.model}\n{temperature}\n{serialize_messages(messages)}"
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def invoke(self, messages, config=None, bypass_cache: bool = False, **kwargs):
+        if not self.enabled or bypass_cache:
+            self._count("bypassed")
+            return self.llm.invoke(messages, config, **kwargs)
+        key = self.cache_key(messages)
+        # identical prompts issued concurrently share one API call
+        return self._flight.do(key, self._invoke, key, messages, config, kwargs)
+
+    def _invoke(self, key: str, messages, config, kwargs) -> AIMessage:
+        now = time.time()
+        content = self._lookup(key, now)
+        if content is not None:
+            return AIMessage(content=content)
+
+        start = time.monotonic()
+        result = self.llm.invoke(messages, config, **kwargs)
+        latency = time.monotonic() - start
+        self._count("misses")
+        if isinstance(result.content, str):
+            self._store(key, result.content, latency, _total_tokens(result), now)
+        return result
+
+    def stream(
+        self,
+        messages,
+        config=None,
+        bypass_cache: bool = False,
+        until: Optional[Callable[[str], bool]] = None,
+        **kwargs,
+    ) -> Iterator[AIMessageChunk]:
+        """
+        Stream the completion. ``until`` is called with the text of every
+        chunk; once it returns True, generation stops after that chunk and
+        the text so far is cached as the completion.
+        """
+        key = None
+        now = time.time()
+        if not self.enabled or bypass_cache:
+            self._count("bypassed")
+        else:
+            key = self.cache_key(messages)
+            content = self._lookup(key, now)
+            if content is not None:
+                if until is not None:
+                    until(content)
+                yield AIMessageChunk(content=content)
+                return
+            self._count("misses")
+
+        start = time.monotonic()
+        parts = []
+        tokens = 0
+        chunks = self.llm.stream(messages, config, **kwargs)
+        try:
+            for chunk in chunks:
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                parts.append(text)
+                tokens += _total_tokens(chunk)
+                done = until is not None and until(text)
+                yield chunk
+                if done:
+                    break
+        finally:
+            # closing early aborts the upstream request as well
+            chunks.close()
+        if key is not None:
+            self._store(key, "".join(parts), time.monotonic() - start, tokens, now)
+
+    def _lookup(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT content, latency, tokens, stored_at "
+                    "FROM completions WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+            if row is not None and now - row[3] < self.ttl:
+                content, latency, tokens, _ = row
+                self._conn.execute(
+                    "UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += latency
+                self._stats["saved_tokens"] += tokens
+                return content
+        return None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _store(
+        self, key: str, content: str, latency: float, tokens: int, now: float
+    ) -> None:
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions "
+                "(key, model, content, latency, tokens, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, self.model, content, latency, tokens, now, now, size),
+            )
+            conn.execute(
+                "DELETE FROM completions WHERE stored_at < ?", (now - self.ttl,)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM completions ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM completions")
+            conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["coalesced"] = self._flight.stats()["coalesced"]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
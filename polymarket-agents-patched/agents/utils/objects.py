@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, Union
+from typing import NamedTuple, Optional, Union
 from pydantic import BaseModel
 
 
@@ -168,6 +168,37 @@ class Market(BaseModel):
     spread: Optional[float] = None
 
 
+class MarketRecord(NamedTuple):
+    """
+    Compact, immutable market holding only the fields the pipeline reads.
+    Built without validation, so only use it for trusted Gamma payloads.
+    """
+
+    id: int
+    question: Optional[str] = None
+    conditionId: Optional[str] = None
+    slug: Optional[str] = None
+    description: Optional[str] = None
+    endDate: Optional[str] = None
+    updatedAt: Optional[str] = None
+    active: Optional[bool] = None
+    closed: Optional[bool] = None
+    archived: Optional[bool] = None
+    restricted: Optional[bool] = None
+    funded: Optional[bool] = None
+    enableOrderBook: Optional[bool] = None
+    acceptingOrders: Optional[bool] = None
+    liquidity: Optional[float] = None
+    volume: Optional[float] = None
+    spread: Optional[float] = None
+    orderPriceMinTickSize: Optional[float] = None
+    rewardsMinSize: Optional[float] = None
+    rewardsMaxSpread: Optional[float] = None
+    outcomes: Optional[list] = None
+    outcomePrices: Optional[list] = None
+    clobTokenIds: Optional[list] = None
+
+
 class ComplexMarket(BaseModel):
     id: int
     condition_id: str
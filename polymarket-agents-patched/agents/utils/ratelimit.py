@@ -0,0 +1,166 @@
+"""
+Per-host rate limiting and retry policy for upstream API calls.
+
+Each host gets a token bucket (sustained requests/sec plus burst) and an
+AIMD concurrency window: every successful response widens the window by
+roughly one slot per round-trip, and a throttling response (429/503) halves
+it. Concurrent fetchers can therefore use a generous thread pool and still
+settle at the highest rate the upstream accepts.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# host -> (requests/sec, burst, max concurrent requests)
+HOST_LIMITS = {
+    "gamma-api.polymarket.com": (20.0, 40, 16),
+    "clob.polymarket.com": (10.0, 20, 8),
+    "api.telegram.org": (25.0, 30, 4),
+    "newsapi.org": (5.0, 10, 4),
+    "api.openai.com": (5.0, 10, 4),
+}
+DEFAULT_LIMITS = (10.0, 20, 8)
+
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus an AIMD-sized concurrency window for a single host.
+
+    Use as a context manager around each request, then report the outcome
+    with ``on_success`` or ``on_throttle``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        decrease_cooldown: float = 1.0,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max_concurrency)
+        # at most one multiplicative decrease per cooldown, so a burst of 429s
+        # from requests already in flight counts as a single congestion signal
+        self.decrease_cooldown = decrease_cooldown
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self.successes = 0
+        self.throttles = 0
+
+    def __enter__(self) -> "AdaptiveLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self.concurrency):
+                self._cond.wait()
+            self._in_flight += 1
+        self.bucket.acquire()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.successes += 1
+            if self.concurrency < self.max_concurrency:
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + 1.0 / self.concurrency
+                )
+                self._cond.notify_all()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                self._last_decrease = now
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "concurrency": self.concurrency,
+                "in_flight": self._in_flight,
+                "successes": self.successes,
+                "throttles": self.throttles,
+            }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(host: Optional[str]) -> AdaptiveLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            rate, burst, max_concurrency = HOST_LIMITS.get(host, DEFAULT_LIMITS)
+            limiter = AdaptiveLimiter(rate, burst, max_concurrency)
+            _limiters[host] = limiter
+        return limiter
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than ``Retry-After``."""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2**attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX_SECONDS))
+    return delay
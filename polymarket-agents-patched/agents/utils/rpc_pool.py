@@ -0,0 +1,228 @@
+"""
+Pool of JSON-RPC endpoints behind a single web3 provider.
+
+Every endpoint keeps a rolling window of response latencies and a failure
+streak. Requests go to the best-ranked healthy endpoint, and an endpoint
+that keeps failing is benched for a cooldown. Idempotent reads (balances,
+nonces, receipts, ``eth_call``) are hedged: if the primary has not answered
+within its own p95 latency, the same request goes to the runner-up and the
+first good answer wins. Writes (``eth_sendRawTransaction``) are never
+duplicated; they only fail over on errors.
+
+A JSON-RPC ``error`` answer (rate limits, "header not found", a lagging
+node) counts as an endpoint failure, except for execution reverts, which
+any node would report the same way. When every endpoint answers with an
+error, the last one is returned so web3 raises it as usual.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import httpx
+from web3.providers import JSONBaseProvider
+
+from agents.utils import transport
+
+HEDGED_METHODS = {
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_feeHistory",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getBlockByNumber",
+    "eth_getCode",
+    "eth_getTransactionByHash",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+    "eth_maxPriorityFeePerGas",
+    "net_version",
+    "web3_clientVersion",
+}
+
+# p95 used before an endpoint has enough samples of its own
+DEFAULT_HEDGE_DELAY_SECONDS = 0.5
+MIN_SAMPLES = 10
+# share of hedged reads led by the runner-up, so its score stays current
+EXPLORE_RATE = 0.05
+FAILURES_BEFORE_COOLDOWN = 3
+COOLDOWN_SECONDS = 30.0
+REQUEST_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+
+class RpcResponseError(Exception):
+    def __init__(self, response: dict) -> None:
+        super().__init__(response.get("error"))
+        self.response = response
+
+
+def is_execution_revert(error: Any) -> bool:
+    if not isinstance(error, dict):
+        return False
+    return error.get("code") == 3 or "revert" in str(error.get("message", "")).lower()
+
+
+class Endpoint:
+    def __init__(self, url: str, window: int = 100) -> None:
+        self.url = url
+        self.latencies = deque(maxlen=window)
+        self.failures = 0
+        self.failure_streak = 0
+        self.benched_until = 0.0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.failure_streak = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.failure_streak += 1
+            if self.failure_streak >= FAILURES_BEFORE_COOLDOWN:
+                self.benched_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.benched_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        return self.percentile(0.95)
+
+    def score(self) -> float:
+        """Lower is better: median latency, inflated by the failure streak."""
+        median = self.percentile(0.5)
+        if median is None:
+            # untried endpoints rank ahead of slow ones so they get sampled
+            return float("inf") if self.failure_streak else 0.0
+        return median * (1 + self.failure_streak)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "samples": len(self.latencies),
+            "failures": self.failures,
+            "healthy": self.healthy(),
+            "hedges_won": self.hedges_won,
+        }
+
+
+class RpcPoolProvider(JSONBaseProvider):
+    def __init__(
+        self,
+        urls: "List[str]",
+        timeout: httpx.Timeout = REQUEST_TIMEOUT,
+        max_workers: int = 16,
+    ) -> None:
+        super().__init__()
+        self.endpoints = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError("RpcPoolProvider needs at least one RPC URL")
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="rpc-pool"
+        )
+
+    def __str__(self) -> str:
+        return f"RpcPoolProvider({[e.url for e in self.endpoints]})"
+
+    def ranked(self) -> List[Endpoint]:
+        healthy = [e for e in self.endpoints if e.healthy()]
+        benched = [e for e in self.endpoints if not e.healthy()]
+        # with everything benched, still try the least-bad endpoints
+        return sorted(healthy, key=Endpoint.score) + sorted(
+            benched, key=lambda e: e.benched_until
+        )
+
+    def _send(self, endpoint: Endpoint, body: bytes) -> dict:
+        start = time.monotonic()
+        try:
+            response = transport.get_client().post(
+                endpoint.url,
+                content=body,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            decoded = self.decode_rpc_response(response.content)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        error = decoded.get("error") if isinstance(decoded, dict) else None
+        if error is not None and not is_execution_revert(error):
+            endpoint.record_failure()
+            raise RpcResponseError(decoded)
+        endpoint.record_success(time.monotonic() - start)
+        return decoded
+
+    def make_request(self, method, params) -> dict:
+        body = self.encode_rpc_request(method, params)
+        endpoints = self.ranked()
+        if method in HEDGED_METHODS and len(endpoints) > 1:
+            return self._hedged(endpoints, body)
+        return self._failover(endpoints, body)
+
+    def _failover(
+        self,
+        endpoints: "List[Endpoint]",
+        body: bytes,
+        last_error: Any = "no endpoints left to try",
+    ) -> dict:
+        for endpoint in endpoints:
+            try:
+                return self._send(endpoint, body)
+            except Exception as e:
+                last_error = e
+        if isinstance(last_error, RpcResponseError):
+            # every node answered, just with an error: let web3 raise it
+            return last_error.response
+        raise ConnectionError(f"all RPC endpoints failed: {last_error}")
+
+    def _hedged(self, endpoints: "List[Endpoint]", body: bytes) -> dict:
+        primary, backup = endpoints[0], endpoints[1]
+        if random.random() < EXPLORE_RATE:
+            primary, backup = backup, primary
+        pending = {self._pool.submit(self._send, primary, body): primary}
+        done, _ = wait(pending, timeout=primary.hedge_delay())
+        hedged = not done
+        if hedged:
+            pending[self._pool.submit(self._send, backup, body)] = backup
+        last_error: Any = "no endpoints left to try"
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if endpoint is backup:
+                    endpoint.hedges_won += 1
+                # a slower duplicate keeps running and still feeds its endpoint's stats
+                return result
+        # everything we sent failed: fall over to the endpoints not yet tried
+        tried = (primary, backup) if hedged else (primary,)
+        return self._failover(
+            [e for e in endpoints if e not in tried], body, last_error
+        )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [endpoint.stats() for endpoint in self.ranked()]
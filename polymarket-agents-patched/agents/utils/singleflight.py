@@ -0,0 +1,76 @@
+"""
+Collapse concurrent identical calls into a single upstream request.
+
+The first caller for a key runs the function; everyone who asks for the same
+key while it is still in flight waits for that result instead of issuing
+their own call. Threads and asyncio tasks share the same in-flight table, so
+a thread and a coroutine asking for the same market also coalesce.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.calls += 1
+            return future, True
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
@@ -0,0 +1,176 @@
+"""
+Token budgeting for LLM prompts.
+
+``TokenCounter`` counts with the model's real tokenizer (tiktoken) and falls
+back to the four-characters-per-token estimate when tiktoken or its encoding
+files are unavailable. Counts of individual market and event items are
+cached, so repeated runs over mostly unchanged market data only tokenize
+what changed.
+
+``pack_chunks`` fills each prompt chunk as close to the model's budget as the
+item sizes allow (first-fit decreasing) instead of splitting the item lists
+into equal-length slices.
+
+Prompt budgets live in ``MODEL_REGISTRY``; entries can be added or
+overridden with ``POLYAI_MODEL_REGISTRY``, a JSON object such as
+``{"gpt-4o": {"prompt_tokens": 120000}}``.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+# role markers and separators the chat format adds around each message
+MESSAGE_OVERHEAD_TOKENS = 8
+ITEM_CACHE_SIZE = 100_000
+
+
+class ModelSpec(BaseModel):
+    # tokens available for the prompt, leaving room for the completion
+    prompt_tokens: int
+    # tiktoken encoding; looked up from the model name when unset
+    encoding: Optional[str] = None
+
+
+MODEL_REGISTRY: Dict[str, ModelSpec] = {
+    "gpt-3.5-turbo": ModelSpec(prompt_tokens=15000),
+    "gpt-3.5-turbo-16k": ModelSpec(prompt_tokens=15000),
+    "gpt-4-1106-preview": ModelSpec(prompt_tokens=95000),
+    "gpt-4-turbo": ModelSpec(prompt_tokens=95000),
+    "gpt-4o": ModelSpec(prompt_tokens=120000),
+    "gpt-4o-mini": ModelSpec(prompt_tokens=120000),
+}
+DEFAULT_MODEL_SPEC = ModelSpec(prompt_tokens=15000)
+
+
+def _load_registry_overrides() -> None:
+    overrides = os.getenv("POLYAI_MODEL_REGISTRY")
+    if not overrides:
+        return
+    for name, spec in json.loads(overrides).items():
+        MODEL_REGISTRY[name] = ModelSpec(**spec)
+
+
+_load_registry_overrides()
+
+
+def model_spec(model: str) -> ModelSpec:
+    spec = MODEL_REGISTRY.get(model)
+    if spec is None:
+        print(
+            f"no token budget registered for {model}, using "
+            f"{DEFAULT_MODEL_SPEC.prompt_tokens}; add it to POLYAI_MODEL_REGISTRY"
+        )
+        return DEFAULT_MODEL_SPEC
+    return spec
+
+
+class TokenCounter:
+    def __init__(self, model: str, encoding: Optional[str] = None) -> None:
+        self.model = model
+        self.encoding = None
+        try:
+            import tiktoken
+
+            if encoding:
+                self.encoding = tiktoken.get_encoding(encoding)
+            else:
+                self.encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            # not installed, unknown model, or encoding files not downloadable
+            print(f"tiktoken unavailable for {model} ({e}), estimating 4 chars/token")
+        self._items: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // 4
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_item(self, item: Any) -> int:
+        """Tokens ``item`` adds to a prompt as one list element or table row."""
+        text = str(item)
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return cached
+        # +1 for the separator between items
+        tokens = self.count(text) + 1
+        with self._lock:
+            self._items[key] = tokens
+            self.misses += 1
+            if len(self._items) > ITEM_CACHE_SIZE:
+                self._items.popitem(last=False)
+        return tokens
+
+    def count_items(self, items: Sequence[Any]) -> int:
+        return sum(self.count_item(item) for item in items)
+
+    def count_messages(self, *texts: str) -> int:
+        return sum(self.count(text) + MESSAGE_OVERHEAD_TOKENS for text in texts)
+
+
+@lru_cache(maxsize=None)
+def counter_for(model: str) -> TokenCounter:
+    return TokenCounter(model, model_spec(model).encoding)
+
+
+def pack_chunks(
+    groups: "Sequence[Sequence[Any]]",
+    budget: int,
+    counter: TokenCounter,
+    render: Callable[[Any], str] = str,
+) -> "List[Tuple[List[Any], ...]]":
+    """
+    Pack the items of several lists (e.g. events and markets) into as few
+    chunks as possible, each costing at most ``budget`` tokens. Every chunk
+    is a tuple holding one list per input group, with items in their
+    original order. An item larger than the whole budget gets a chunk of
+    its own. ``render`` is how the prompt will print an item.
+    """
+    items = [
+        (counter.count_item(render(item)), g, i)
+        for g, group in enumerate(groups)
+        for i, item in enumerate(group)
+    ]
+    items.sort(key=lambda entry: entry[0], reverse=True)
+
+    bins: List[List[Tuple[int, int]]] = []
+    room: List[int] = []
+    for tokens, g, i in items:
+        for b, free in enumerate(room):
+            if tokens <= free:
+                bins[b].append((g, i))
+                room[b] -= tokens
+                break
+        else:
+            if tokens > budget:
+                print(f"item of {tokens} tokens exceeds the {budget} token budget")
+            bins.append([(g, i)])
+            room.append(budget - tokens)
+
+    chunks = []
+    for members in bins:
+        members.sort()
+        chunks.append(
+            tuple(
+                [groups[g][i] for g2, i in members if g2 == g]
+                for g in range(len(groups))
+            )
+        )
+    return chunks
@@ -0,0 +1,90 @@
+"""
+Incremental parsing of the ``price / size / side`` trade the LLM is asked
+for in ``Prompter.one_best_trade``.
+
+``TradeParser`` is fed completion text as it streams in. A field, the side
+included, counts as parsed once its value is followed by a delimiter, so a
+price streamed as ``0.`` then ``55`` is never read as ``0``. The parser is
+``complete`` as soon as all three fields are in, which lets the caller stop
+generation. It raises
+``MalformedTradeError`` as soon as the answer cannot become well formed: a
+field with a non-numeric value, or no field at all after ``max_preamble``
+characters.
+"""
+
+import re
+from typing import Optional
+
+# a value only counts once something follows it
+_NUMBER_FIELD = (
+    r"{name}\W{{0,3}}\s*:\s*['\"`]?\s*([^\s,'\"`}}\]]+)\s*['\"`]?\s*[,\n`}}\]]"
+)
+_FIELDS = {
+    "price": re.compile(_NUMBER_FIELD.format(name="price"), re.IGNORECASE),
+    "size": re.compile(_NUMBER_FIELD.format(name="size"), re.IGNORECASE),
+}
+_SIDE = re.compile(
+    r"side\W{0,3}\s*:\s*['\"`]?\s*(BUY|SELL)(?=[\s,'\"`}\]])", re.IGNORECASE
+)
+_ANY_FIELD = re.compile(r"\b(price|size|side)\W{0,3}\s*:", re.IGNORECASE)
+_NUMBER = re.compile(r"^\d*\.?\d+%?$")
+
+
+class MalformedTradeError(ValueError):
+    pass
+
+
+class TradeParser:
+    def __init__(self, max_preamble: int = 600) -> None:
+        self.max_preamble = max_preamble
+        self.text = ""
+        self.price: Optional[float] = None
+        self.size: Optional[float] = None
+        self.side: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return None not in (self.price, self.size, self.side)
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text; returns ``complete``."""
+        self.text += chunk or ""
+        self._scan(self.text)
+        if not _ANY_FIELD.search(self.text) and len(self.text) > self.max_preamble:
+            raise MalformedTradeError(
+                f"no price/size/side after {len(self.text)} characters: {self.text!r}"
+            )
+        return self.complete
+
+    def finish(self) -> "TradeParser":
+        """End of stream: accept values that close the text, then validate."""
+        self._scan(self.text + "\n")
+        if self.size is None:
+            raise MalformedTradeError(f"no trade size in LLM output: {self.text!r}")
+        return self
+
+    def _scan(self, text: str) -> None:
+        for name, pattern in _FIELDS.items():
+            if getattr(self, name) is not None:
+                continue
+            match = pattern.search(text)
+            if match is None:
+                continue
+            value = match.group(1)
+            if not _NUMBER.match(value):
+                raise MalformedTradeError(f"{name} is not a number: {value!r}")
+            number = float(value.rstrip("%"))
+            if value.endswith("%"):
+                number /= 100
+            setattr(self, name, number)
+        if self.side is None:
+            match = _SIDE.search(text)
+            if match is not None:
+                self.side = match.group(1).upper()
+
+
+def parse_trade(text: str) -> TradeParser:
+    """Parse a finished completion."""
+    parser = TradeParser(max_preamble=len(text or "") + 1)
+    parser.feed(text)
+    return parser.finish()
@@ -0,0 +1,223 @@
+"""
+Shared HTTP transport for every upstream API the agents talk to.
+
+All Gamma, CLOB, Telegram and News calls go through one long-lived
+connection pool per process instead of opening a fresh TCP+TLS connection
+per request. HTTP/2 is negotiated via ALPN when the optional ``h2`` package
+is installed and the host supports it; otherwise the pool speaks keep-alive
+HTTP/1.1.
+
+Every request is paced by the host's limiter in ``agents.utils.ratelimit``
+and retried with jittered exponential backoff on throttling and transient
+server errors. Non-idempotent methods are only retried on 429, which means
+the upstream rejected the request without processing it.
+
+``py_clob_client`` sends every CLOB call (order books, midpoints, order
+posts, API key derivation) through its own ``requests.request`` helper.
+``install_clob_transport`` swaps that helper for ``clob_request`` so those
+calls share the pool, the limiter and the retries too. Nothing is patched
+on import; the CLOB client installs it when it is first created.
+"""
+
+import atexit
+import contextlib
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from agents.utils import ratelimit
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "polymarket-agents",
+}
+
+DEFAULT_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
+
+# Read timeouts are sized to each host's typical latency; Telegram long-polls
+# pass their own, longer timeout explicitly.
+HOST_TIMEOUTS = {
+    "gamma-api.polymarket.com": httpx.Timeout(15.0, connect=5.0),
+    "clob.polymarket.com": httpx.Timeout(10.0, connect=5.0),
+    "api.telegram.org": httpx.Timeout(20.0, connect=5.0),
+    "newsapi.org": httpx.Timeout(30.0, connect=5.0),
+}
+
+POOL_LIMITS = httpx.Limits(
+    max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0
+)
+
+_lock = threading.Lock()
+_client = None
+_session = None
+
+
+def timeout_for(url: str) -> httpx.Timeout:
+    return HOST_TIMEOUTS.get(urlsplit(url).hostname, DEFAULT_TIMEOUT)
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide pooled ``httpx.Client``, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    headers=DEFAULT_HEADERS,
+                    limits=POOL_LIMITS,
+                    timeout=DEFAULT_TIMEOUT,
+                )
+    return _client
+
+
+def get_requests_session() -> requests.Session:
+    """
+    Return a pooled ``requests.Session`` for third-party SDKs (e.g. newsapi)
+    that only accept a requests-compatible session.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _send(
+    method: str,
+    url: str,
+    stream: bool = False,
+    max_retries: int = ratelimit.MAX_RETRIES,
+    **kwargs,
+) -> httpx.Response:
+    kwargs.setdefault("timeout", timeout_for(url))
+    client = get_client()
+    limiter = ratelimit.limiter_for(urlsplit(url).hostname)
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    attempt = 0
+    while True:
+        response = None
+        with limiter:
+            try:
+                response = client.send(
+                    client.build_request(method, url, **kwargs), stream=stream
+                )
+            except httpx.TransportError:
+                if not idempotent or attempt >= max_retries:
+                    raise
+
+        if response is not None:
+            status = response.status_code
+            if status in ratelimit.THROTTLE_STATUSES:
+                limiter.on_throttle()
+            elif status < 500:
+                limiter.on_success()
+            retryable = status == 429 or (
+                idempotent and status in ratelimit.RETRY_STATUSES
+            )
+            if not retryable or attempt >= max_retries:
+                return response
+            retry_after = ratelimit.parse_retry_after(
+                response.headers.get("retry-after")
+            )
+            response.close()
+        else:
+            retry_after = None
+
+        time.sleep(ratelimit.backoff_delay(attempt, retry_after))
+        attempt += 1
+
+
+def request(method: str, url: str, **kwargs) -> httpx.Response:
+    return _send(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> httpx.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> httpx.Response:
+    return request("POST", url, **kwargs)
+
+
+@contextlib.contextmanager
+def stream(method: str, url: str, **kwargs):
+    """Context manager yielding a response whose body is read incrementally."""
+    response = _send(method, url, stream=True, **kwargs)
+    try:
+        yield response
+    finally:
+        response.close()
+
+
+def clob_request(endpoint: str, method: str, headers=None, data=None):
+    """
+    Drop-in replacement for ``py_clob_client.http_helpers.helpers.request``:
+    same arguments, same return value, same ``PolyApiException`` on errors.
+    """
+    from py_clob_client.exceptions import PolyApiException
+    from py_clob_client.http_helpers import helpers
+
+    headers = helpers.overloadHeaders(method, headers)
+    # serialize like requests does: L2 auth signs str(body) with the default
+    # separators, and httpx's own json encoder is more compact
+    content = json.dumps(data, allow_nan=False).encode("utf-8") if data else None
+    try:
+        resp = request(method, endpoint, headers=headers, content=content)
+    except httpx.HTTPError:
+        raise PolyApiException(error_msg="Request exception!")
+    if resp.status_code != 200:
+        raise PolyApiException(resp)
+    try:
+        return resp.json()
+    except ValueError:
+        return resp.text
+
+
+def install_clob_transport() -> None:
+    """
+    Route all ``py_clob_client`` HTTP traffic through ``clob_request``.
+    Safe to call repeatedly; ``Polymarket.client`` calls it on first use.
+    """
+    from py_clob_client.http_helpers import helpers
+
+    # post/get/delete and ClobClient look ``request`` up at call time
+    if helpers.request is not clob_request:
+        helpers.request = clob_request
+
+
+def close() -> None:
+    global _client, _session
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+atexit.register(close)
@@ -1,4 +1,6 @@
+import itertools
 import json
+from typing import Callable, Iterable, Iterator
 
 
 def parse_camel_case(key) -> str:
@@ -32,7 +34,9 @@ def preprocess_market_object(market_object: dict) -> dict:
     return market_object
 
 
-def preprocess_local_json(file_path: str, preprocessor_function: function) -> None:
+def preprocess_local_json(
+    file_path: str, preprocessor_function: Callable[[dict], dict]
+) -> None:
     with open(file_path, "r+") as open_file:
         data = json.load(open_file)
 
@@ -57,3 +61,49 @@ def metadata_func(record: dict, metadata: dict) -> dict:
     del metadata["events"]
 
     return metadata
+
+
+def iter_json_array(chunks: "Iterable[str]") -> Iterator:
+    """
+    Incrementally decode a top-level JSON array from text chunks, yielding each
+    element as soon as it is complete instead of buffering the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            buffer = buffer[pos:] + chunk
+            pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            # a bare number or literal is only complete once a delimiter follows
+            # it; "1500." may continue as "1500.0" in the next chunk
+            if (
+                not final
+                and not isinstance(item, (dict, list))
+                and (end == len(buffer) or buffer[end] not in " \t\r\n,]")
+            ):
+                break
+            yield item
+            pos = end
+    raise ValueError("truncated JSON array")
@@ -0,0 +1,83 @@
+import io
+import json
+import time
+
+import typer
+
+from agents.polymarket.gamma import GammaMarketClient
+from agents.utils.objects import ClobReward, Market, PolymarketEvent, Tag
+
+app = typer.Typer()
+
+
+def legacy_decode(data: "list[dict]", log: io.StringIO) -> "list[Market]":
+    """The previous per-object decoder, including its debug prints."""
+    markets = []
+    for market_object in data:
+        if "clobRewards" in market_object:
+            market_object["clobRewards"] = [
+                ClobReward(**r) for r in market_object["clobRewards"]
+            ]
+        if "events" in market_object:
+            events = []
+            for event_object in market_object["events"]:
+                print("[parse_nested_event] called with:", event_object, file=log)
+                if "tags" in event_object:
+                    print("tags here", event_object["tags"], file=log)
+                    event_object["tags"] = [Tag(**t) for t in event_object["tags"]]
+                events.append(PolymarketEvent(**event_object))
+            market_object["events"] = events
+        for key in ("outcomePrices", "clobTokenIds"):
+            if key in market_object:
+                market_object[key] = json.loads(market_object[key])
+        markets.append(Market(**market_object))
+    return markets
+
+
+def markets_per_second(decode, raw_payload: str, rounds: int) -> float:
+    elapsed = 0.0
+    count = 0
+    for _ in range(rounds):
+        # the legacy decoder mutates its input, so every round gets a fresh copy
+        data = json.loads(raw_payload)
+        start = time.perf_counter()
+        decode(data)
+        elapsed += time.perf_counter() - start
+        count += len(data)
+    return count / elapsed if elapsed else float("inf")
+
+
+@app.command()
+def record(payload_path: str, limit: int = 500) -> None:
+    """
+    Record a raw Gamma markets page to disk for benchmarking
+    """
+    GammaMarketClient().get_markets(
+        querystring_params={"limit": limit}, local_file_path=payload_path
+    )
+    print(f"recorded markets page to {payload_path}")
+
+
+@app.command()
+def run(payload_path: str, rounds: int = 5) -> None:
+    """
+    Compare markets/sec of the legacy and fast decoders on a recorded page
+    """
+    gamma = GammaMarketClient()
+    with open(payload_path, "r") as f:
+        raw_payload = f.read()
+    print(f"{len(json.loads(raw_payload))} markets, {rounds} rounds")
+
+    # legacy prints go to an in-memory sink so terminal speed doesn't skew results
+    log = io.StringIO()
+    before = markets_per_second(lambda d: legacy_decode(d, log), raw_payload, rounds)
+    batched = markets_per_second(gamma.parse_pydantic_markets, raw_payload, rounds)
+    records = markets_per_second(gamma.parse_market_records, raw_payload, rounds)
+    print(f"before  (per-object + prints): {before:,.0f} markets/sec")
+    print(f"batched (TypeAdapter):         {batched:,.0f} markets/sec")
+    print(f"records (MarketRecord):        {records:,.0f} markets/sec")
+    print(f"speedup: {batched / before:.1f}x batched, {records / before:.1f}x records")
+
+
+if __name__ == "__main__":
+    app()
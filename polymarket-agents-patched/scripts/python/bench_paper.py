@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import time
+from typing import List, Optional
+
+import typer
+
+from agents.polymarket.paper import PaperTrader, load_books, save_books
+
+app = typer.Typer()
+
+
+def synthetic_books(tokens: int, levels: int = 50) -> "dict[str, dict]":
+    books = {}
+    for t in range(tokens):
+        mid = random.uniform(0.1, 0.9)
+        books[str(t)] = {
+            "bids": [
+                {
+                    "price": round(mid - 0.01 * (i + 1), 3),
+                    "size": random.uniform(50, 500),
+                }
+                for i in range(levels)
+                if mid - 0.01 * (i + 1) > 0
+            ],
+            "asks": [
+                {
+                    "price": round(mid + 0.01 * (i + 1), 3),
+                    "size": random.uniform(50, 500),
+                }
+                for i in range(levels)
+                if mid + 0.01 * (i + 1) < 1
+            ],
+        }
+    return books
+
+
+@app.command()
+def record(token_ids: List[str], books_path: str) -> None:
+    """
+    Record live CLOB order books for replay
+    """
+    from agents.polymarket.polymarket import Polymarket
+
+    result = Polymarket().get_orderbooks(token_ids)
+    save_books(result.values, books_path)
+    print(
+        f"recorded {len(result.values)} books to {books_path}, errors: {result.errors}"
+    )
+
+
+@app.command()
+def run(books_path: Optional[str] = None, orders: int = 10000) -> None:
+    """
+    Replay random limit and FOK orders against recorded (or synthetic) books
+    """
+    books = load_books(books_path) if books_path else synthetic_books(100)
+    token_ids = list(books)
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = PaperTrader(books, journal_path=os.path.join(tmp, "journal.json"))
+        start = time.perf_counter()
+        for _ in range(orders):
+            token_id = random.choice(token_ids)
+            if random.random() < 0.5:
+                trader.execute(token_id, "BUY", amount=random.uniform(5, 200), fok=True)
+            else:
+                side = random.choice(("BUY", "SELL"))
+                trader.execute_order(
+                    random.uniform(0.05, 0.95), random.uniform(10, 300), side, token_id
+                )
+        trader.close()
+        elapsed = time.perf_counter() - start
+    print(f"{orders} orders over {len(token_ids)} books: {trader.fills} fills")
+    print(f"{orders / elapsed:,.0f} orders/sec (journal included)")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,72 @@
+import os
+import time
+
+import typer
+from eth_account import Account
+from py_order_utils.builders import OrderBuilder
+from py_order_utils.model import OrderData
+from py_order_utils.signer import Signer
+
+from agents.polymarket.signing import OrderRequest, SigningContext
+
+app = typer.Typer()
+
+EXCHANGE_ADDRESS = "0x4bfb41d5b3570defd03c39a9a4d8de6bd8b8982e"
+CHAIN_ID = 137
+TOKEN_ID = (
+    "71321045679252212594626385532706912750332728571942532289631379312455583992563"
+)
+
+
+def legacy_sign(private_key: str, request: OrderRequest):
+    """The previous build_order: a fresh Signer and OrderBuilder per order."""
+    signer = Signer(private_key)
+    builder = OrderBuilder(EXCHANGE_ADDRESS, CHAIN_ID, signer)
+    order_data = OrderData(
+        maker=Account.from_key(private_key).address,
+        tokenId=request.market_token,
+        makerAmount=request.amount,
+        takerAmount=0,
+        feeRateBps="1",
+        nonce=request.nonce,
+        side=0,
+        expiration=request.expiration,
+    )
+    return builder.build_signed_order(order_data)
+
+
+def orders_per_second(sign_batch, requests: "list[OrderRequest]") -> float:
+    start = time.perf_counter()
+    sign_batch(requests)
+    elapsed = time.perf_counter() - start
+    return len(requests) / elapsed if elapsed else float("inf")
+
+
+@app.command()
+def run(orders: int = 1000, processes: int = os.cpu_count() or 1) -> None:
+    """
+    Compare orders signed/sec per-call, with a reused context and with a process pool
+    """
+    # throwaway key: nothing signed here is ever posted
+    private_key = Account.create().key.hex()
+    requests = [
+        OrderRequest(TOKEN_ID, 1_000_000 + i, nonce=str(i)) for i in range(orders)
+    ]
+    context = SigningContext(private_key, EXCHANGE_ADDRESS, CHAIN_ID)
+    print(f"{orders} orders, {processes} processes")
+
+    before = orders_per_second(
+        lambda batch: [legacy_sign(private_key, r) for r in batch], requests
+    )
+    reused = orders_per_second(context.sign_many, requests)
+    pooled = orders_per_second(
+        lambda batch: context.sign_many(batch, processes=processes), requests
+    )
+    print(f"before (Signer per order): {before:,.0f} orders/sec")
+    print(f"reused context:            {reused:,.0f} orders/sec")
+    print(f"process pool:              {pooled:,.0f} orders/sec")
+    print(f"speedup: {reused / before:.1f}x reused, {pooled / before:.1f}x pooled")
+
+
+if __name__ == "__main__":
+    app()
@@ -1,7 +1,11 @@
+import numpy as np
 import typer
 from devtools import pprint
 
 from agents.polymarket.polymarket import Polymarket
+from agents.polymarket.sync import MarketSync
+from agents.polymarket.market_table import NUMERIC_COLUMNS
+from agents.utils.objects import SimpleMarket
 from agents.connectors.chroma import PolymarketRAG
 from agents.connectors.news import News
 from agents.application.trade import Trader
@@ -20,14 +24,35 @@ def get_all_markets(limit: int = 5, sort_by: str = "spread") -> None:
     Query Polymarket's markets
     """
     print(f"limit: int = {limit}, sort_by: str = {sort_by}")
-    markets = polymarket.get_all_markets()
-    markets = polymarket.filter_markets_for_trading(markets)
-    if sort_by == "spread":
-        markets = sorted(markets, key=lambda x: x.spread, reverse=True)
-    markets = markets[:limit]
+    table = polymarket.get_market_table()
+    tradeable = table.tradeable_mask()
+    if sort_by in NUMERIC_COLUMNS:
+        rows = table.top_k(sort_by, limit, mask=tradeable)
+    else:
+        rows = np.flatnonzero(tradeable)[:limit]
+    markets = []
+    for market in table.rows(rows):
+        try:
+            markets.append(SimpleMarket(**polymarket.map_api_to_market(market)))
+        except Exception as e:
+            print(e)
     pprint(markets)
 
 
+@app.command()
+def sync_markets() -> None:
+    """
+    Sync the local market table, pulling only markets updated since the last run
+    """
+    market_sync = MarketSync()
+    delta = market_sync.sync()
+    print(
+        f"added: {len(delta.added)}, changed: {len(delta.changed)}, "
+        f"removed: {len(delta.removed)}, total: {len(market_sync.markets)}, "
+        f"high_water_mark: {delta.high_water_mark}"
+    )
+
+
 @app.command()
 def get_relevant_news(keywords: str) -> None:
     """
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 import os
 import time
-import requests
 
 from agents.polymarket.polymarket import Polymarket
+from agents.utils import transport
 from agents.notifications.state import recent_trades, pnl_summary, open_trades
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
@@ -21,14 +21,14 @@ def send(text: str, reply_markup=None):
     }
     if reply_markup:
         payload["reply_markup"] = reply_markup
-    requests.post(f"{API}/sendMessage", json=payload, timeout=20)
+    transport.post(f"{API}/sendMessage", json=payload)
 
 
 def answer_callback(callback_id: str):
     if not callback_id:
         return
     try:
-        requests.post(f"{API}/answerCallbackQuery", json={"callback_query_id": callback_id}, timeout=10)
+        transport.post(f"{API}/answerCallbackQuery", json={"callback_query_id": callback_id}, timeout=10)
     except Exception:
         pass
 
@@ -76,6 +76,20 @@ def format_pnl() -> str:
     )
 
 
+def format_top_markets(polymarket: Polymarket, limit: int = 5) -> str:
+    table = polymarket.get_market_table()
+    rows = table.top_k("volume", limit, mask=table.tradeable_mask())
+    if len(rows) == 0:
+        return "No tradeable markets found."
+    lines = [f"Top {len(rows)} markets by volume:"]
+    for i in rows:
+        q = table.markets[i].get("question", "Unknown")
+        lines.append(
+            f"- ${table.volume[i]:,.0f} vol | yes {table.price_yes[i]:.2f} | {q}"
+        )
+    return "\n".join(lines)
+
+
 def status_text(polymarket: Polymarket) -> str:
     bal = polymarket.get_usdc_balance()
     open_pos = open_trades()
@@ -120,6 +134,7 @@ def handle_command(cmd: str, polymarket: Polymarket):
             "/positions - open tracked trades\n"
             "/recent - last 5 trades\n"
             "/pnl - settled PnL summary\n"
+            "/top - top markets by volume\n"
             "/help",
             reply_markup=dashboard_buttons(),
         )
@@ -153,6 +168,10 @@ def handle_command(cmd: str, polymarket: Polymarket):
         send(format_pnl(), reply_markup=dashboard_buttons())
         return
 
+    if cmd == "/top":
+        send(format_top_markets(polymarket), reply_markup=dashboard_buttons())
+        return
+
 
 def handle_callback(data: str, callback_id: str, polymarket: Polymarket):
     action = (data or "").strip().lower()
@@ -176,43 +195,46 @@ def run():
 
     polymarket = Polymarket()
     offset = None
-    while True:
-        try:
-            payload = {"timeout": 30}
-            if offset is not None:
-                payload["offset"] = offset
-            r = requests.get(f"{API}/getUpdates", params=payload, timeout=40)
-            data = r.json()
-            if not data.get("ok"):
-                time.sleep(2)
-                continue
-
-            for upd in data.get("result", []):
-                offset = upd["update_id"] + 1
+    try:
+        while True:
+            try:
+                payload = {"timeout": 30}
+                if offset is not None:
+                    payload["offset"] = offset
+                r = transport.get(f"{API}/getUpdates", params=payload, timeout=40)
+                data = r.json()
+                if not data.get("ok"):
+                    time.sleep(2)
+                    continue
 
-                # callback buttons
-                if "callback_query" in upd:
-                    cq = upd.get("callback_query", {})
-                    callback_id = cq.get("id")
-                    cb_data = cq.get("data", "")
-                    chat_id = str(cq.get("message", {}).get("chat", {}).get("id", ""))
-                    if CHAT_ID and chat_id != CHAT_ID:
+                for upd in data.get("result", []):
+                    offset = upd["update_id"] + 1
+
+                    # callback buttons
+                    if "callback_query" in upd:
+                        cq = upd.get("callback_query", {})
+                        callback_id = cq.get("id")
+                        cb_data = cq.get("data", "")
+                        chat_id = str(cq.get("message", {}).get("chat", {}).get("id", ""))
+                        if CHAT_ID and chat_id != CHAT_ID:
+                            continue
+                        handle_callback(cb_data, callback_id, polymarket)
                         continue
-                    handle_callback(cb_data, callback_id, polymarket)
-                    continue
 
-                msg = upd.get("message", {})
-                text = msg.get("text", "")
-                chat_id = str(msg.get("chat", {}).get("id", ""))
+                    msg = upd.get("message", {})
+                    text = msg.get("text", "")
+                    chat_id = str(msg.get("chat", {}).get("id", ""))
 
-                # Restrict responses to configured chat if set
-                if CHAT_ID and chat_id != CHAT_ID:
-                    continue
+                    # Restrict responses to configured chat if set
+                    if CHAT_ID and chat_id != CHAT_ID:
+                        continue
 
-                if text.startswith("/"):
-                    handle_command(text, polymarket)
-        except Exception:
-            time.sleep(2)
+                    if text.startswith("/"):
+                        handle_command(text, polymarket)
+            except Exception:
+                time.sleep(2)
+    finally:
+        polymarket.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+from agents.polymarket.execution import OrderEngine, OrderTicket
+
+
+class FakeClobClient:
+    def __init__(self, cancel_error=None, reject=()):
+        self.cancel_error = cancel_error
+        self.reject = set(reject)
+        self.creds = object()
+        self.cancelled = []
+        self.posted = []
+
+    def create_order(self, args):
+        return args.token_id
+
+    def create_market_order(self, args):
+        return args.token_id
+
+    def cancel_orders(self, order_ids):
+        if self.cancel_error is not None:
+            raise self.cancel_error
+        self.cancelled.extend(order_ids)
+        return {"canceled": order_ids}
+
+    def post_order(self, signed_order, order_type):
+        self.posted.append(signed_order)
+        if signed_order in self.reject:
+            return {"success": False, "errorMsg": "not enough balance"}
+        return {"success": True, "orderID": f"order-{signed_order}"}
+
+
+def ticket(token_id):
+    return OrderTicket(token_id=token_id, price=0.5, size=10)
+
+
+class TestOrderEngine(unittest.TestCase):
+    def make_engine(self, client):
+        # one order per batch, so every post goes through client.post_order
+        engine = OrderEngine(client, batch_size=1, max_workers=2)
+        self.addCleanup(engine.close)
+        return engine
+
+    def test_cancel_replace_posts_after_cancel(self):
+        client = FakeClobClient()
+        tickets = self.make_engine(client).submit(
+            [ticket("a"), ticket("b")], cancel_order_ids=["old"]
+        )
+        self.assertEqual(client.cancelled, ["old"])
+        self.assertEqual(sorted(client.posted), ["a", "b"])
+        self.assertTrue(all(t.error is None for t in tickets))
+
+    def test_failed_cancel_skips_post_and_flags_every_ticket(self):
+        client = FakeClobClient(cancel_error=ConnectionError("cancel timed out"))
+        tickets = self.make_engine(client).submit(
+            [ticket("a"), ticket("b")], cancel_order_ids=["old"]
+        )
+        self.assertEqual(client.posted, [])
+        for t in tickets:
+            self.assertIn("cancel failed", t.error)
+            self.assertIn("cancel timed out", t.error)
+
+    def test_rejected_order_is_flagged(self):
+        client = FakeClobClient(reject=["b"])
+        a, b = self.make_engine(client).submit([ticket("a"), ticket("b")])
+        self.assertIsNone(a.error)
+        self.assertIn("not enough balance", b.error)
+
+    def test_submit_inside_running_loop(self):
+        client = FakeClobClient()
+        engine = self.make_engine(client)
+
+        async def handler():
+            return engine.submit([ticket("a")])
+
+        (result,) = asyncio.run(handler())
+        self.assertEqual(result.response["orderID"], "order-a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+from agents.utils import http_cache, transport
+from agents.utils.http_cache import ResponseCache
+
+GAMMA = "https://gamma-api.polymarket.com"
+
+
+class FakeGamma:
+    """Serves ``pages`` (path -> body) with an ETag, honouring If-None-Match."""
+
+    def __init__(self, validator="etag"):
+        self.pages = {}
+        self.versions = {}
+        self.validator = validator
+        self.requests = []
+
+    def publish(self, path, body):
+        self.pages[path] = body
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def __call__(self, request):
+        self.requests.append(request)
+        path = request.url.path
+        tag = f'"v{self.versions[path]}"'
+        if self.validator == "etag":
+            headers = {"ETag": tag}
+            unchanged = request.headers.get("if-none-match") == tag
+        elif self.validator == "last-modified":
+            headers = {"Last-Modified": tag}
+            unchanged = request.headers.get("if-modified-since") == tag
+        else:
+            headers, unchanged = {}, False
+        if unchanged:
+            return httpx.Response(304, headers=headers)
+        headers["Content-Type"] = "application/json"
+        return httpx.Response(200, headers=headers, content=self.pages[path])
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.saved_client = transport._client
+        self.now = 1000.0
+        patcher = mock.patch.object(http_cache.time, "time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+
+    def tearDown(self):
+        transport._client.close()
+        transport._client = self.saved_client
+
+    def cache(self, validator="etag", **kwargs):
+        self.gamma = FakeGamma(validator)
+        transport._client = httpx.Client(transport=httpx.MockTransport(self.gamma))
+        kwargs.setdefault("ttls", {"/markets": 30})
+        return ResponseCache(path=self.path, **kwargs)
+
+    def get(self, cache, path, params=None):
+        self.now += 1
+        return cache.get(GAMMA + path, params=params).content
+
+
+class TestFreshness(ResponseCacheTestCase):
+    def test_fresh_entry_is_served_locally(self):
+        cache = self.cache()
+        self.gamma.publish("/markets", b"[1]")
+        self.assertEqual(self.get(cache, "/markets"), b"[1]")
+        self.assertEqual(self.get(cache, "/markets"), b"[1]")
+        self.assertEqual(len(self.gamma.requests), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_params_are_part_of_the_key(self):
+        cache = self.cache()
+        self.gamma.publish("/markets", b"[1]")
+        self.get(cache, "/markets", {"limit": 1, "offset": 0})
+        self.get(cache, "/markets", {"offset": 0, "limit": 1})
+        self.get(cache, "/markets", {"offset": 100, "limit": 1})
+        self.assertEqual(len(self.gamma.requests), 2)
+
+    def test_expired_entry_is_fetched_again(self):
+        cache = self.cache(validator=None)
+        self.gamma.publish("/markets", b"[1]")
+        self.get(cache, "/markets")
+        self.now += 30
+        self.gamma.publish("/markets", b"[2]")
+        self.assertEqual(self.get(cache, "/markets"), b"[2]")
+        self.assertEqual(len(self.gamma.requests), 2)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_paths_without_ttl_are_not_cached(self):
+        cache = self.cache()
+        self.gamma.publish("/events", b"[]")
+        self.get(cache, "/events")
+        self.get(cache, "/events")
+        self.assertEqual(len(self.gamma.requests), 2)
+
+    def test_disabled_cache_passes_through(self):
+        cache = self.cache(enabled=False)
+        self.gamma.publish("/markets", b"[1]")
+        self.get(cache, "/markets")
+        self.get(cache, "/markets")
+        self.assertEqual(len(self.gamma.requests), 2)
+
+
+class TestRevalidation(ResponseCacheTestCase):
+    def test_etag_304_refreshes_the_entry(self):
+        cache = self.cache()
+        self.gamma.publish("/markets", b"[1]")
+        self.get(cache, "/markets")
+        self.now += 30
+        self.assertEqual(self.get(cache, "/markets"), b"[1]")
+        self.assertEqual(self.gamma.requests[-1].headers["if-none-match"], '"v1"')
+        self.assertEqual(cache.stats()["revalidated"], 1)
+        # the 304 restarted the TTL, so the next read stays local
+        self.get(cache, "/markets")
+        self.assertEqual(len(self.gamma.requests), 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_last_modified_is_sent_as_if_modified_since(self):
+        cache = self.cache(validator="last-modified")
+        self.gamma.publish("/markets", b"[1]")
+        self.get(cache, "/markets")
+        self.now += 30
+        self.assertEqual(self.get(cache, "/markets"), b"[1]")
+        self.assertEqual(self.gamma.requests[-1].headers["if-modified-since"], '"v1"')
+        self.assertEqual(cache.stats()["revalidated"], 1)
+
+    def test_changed_body_replaces_the_entry(self):
+        cache = self.cache()
+        self.gamma.publish("/markets", b"[1]")
+        self.get(cache, "/markets")
+        self.now += 30
+        self.gamma.publish("/markets", b"[1, 2]")
+        self.assertEqual(self.get(cache, "/markets"), b"[1, 2]")
+        self.assertEqual(self.get(cache, "/markets"), b"[1, 2]")
+        self.assertEqual(len(self.gamma.requests), 2)
+
+
+class TestEviction(ResponseCacheTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self.cache(max_bytes=250)
+        for path in ("/markets/a", "/markets/b", "/markets/c"):
+            self.gamma.publish(path, b"x" * 100)
+        self.get(cache, "/markets/a")
+        self.get(cache, "/markets/b")
+        self.get(cache, "/markets/a")  # a is now more recent than b
+        self.get(cache, "/markets/c")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        requests = len(self.gamma.requests)
+        self.get(cache, "/markets/a")
+        self.get(cache, "/markets/c")
+        self.assertEqual(len(self.gamma.requests), requests)
+        self.get(cache, "/markets/b")
+        self.assertEqual(len(self.gamma.requests), requests + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import json
+import unittest
+
+import httpx
+from eth_abi import decode, encode
+from eth_utils import to_checksum_address
+from web3 import Web3
+
+from agents.polymarket import onchain
+from agents.polymarket.onchain import ChainReader
+from agents.utils import transport
+from agents.utils.rpc_pool import RpcPoolProvider
+
+MULTICALL = to_checksum_address("0xca11bde05977b3631167028862be2a173976ca11")
+USDC = to_checksum_address("0x2791bca1f2de4661ed88a30c99a7a9449aa84174")
+CTF = to_checksum_address("0x4d97dcd97ec945f40cf65f87097ace5ea0476045")
+WALLET = to_checksum_address("0x00000000000000000000000000000000000000aa")
+EXCHANGE = to_checksum_address("0x00000000000000000000000000000000000000e1")
+ADAPTER = to_checksum_address("0x00000000000000000000000000000000000000e2")
+
+
+class FakeChain:
+    """JSON-RPC node holding USDC, CTF and Multicall3 state at one block."""
+
+    def __init__(self, block=100):
+        self.block = block
+        self.usdc_balances = {}
+        self.allowances = {}
+        self.approvals = set()
+        self.positions = {}
+        self.methods = []
+
+    def __call__(self, request):
+        rpc = json.loads(request.content)
+        self.methods.append(rpc["method"])
+        body = {"jsonrpc": "2.0", "id": rpc["id"]}
+        if rpc["method"] == "eth_blockNumber":
+            body["result"] = hex(self.block)
+        elif rpc["method"] == "eth_chainId":
+            body["result"] = hex(137)
+        elif rpc["method"] == "eth_call":
+            tx = rpc["params"][0]
+            try:
+                data = self.call(
+                    to_checksum_address(tx["to"]), bytes.fromhex(tx["data"][2:])
+                )
+            except LookupError as e:
+                body["error"] = {"code": 3, "message": f"execution reverted: {e}"}
+            else:
+                body["result"] = "0x" + data.hex()
+        else:
+            body["error"] = {"code": -32601, "message": "method not found"}
+        return httpx.Response(200, json=body)
+
+    def call(self, target, data):
+        selector, args = data[:4], data[4:]
+        if target == MULTICALL and selector == onchain.AGGREGATE3:
+            (calls,) = decode(["(address,bool,bytes)[]"], args)
+            results = []
+            for call_target, allow_failure, call_data in calls:
+                try:
+                    results.append(
+                        (True, self.call(to_checksum_address(call_target), call_data))
+                    )
+                except LookupError:
+                    results.append((False, b""))
+            return encode(["(bool,bytes)[]"], [results])
+        if target == USDC and selector == onchain.BALANCE_OF:
+            (owner,) = map(to_checksum_address, decode(["address"], args))
+            return encode(["uint256"], [self.usdc_balances.get(owner, 0)])
+        if target == USDC and selector == onchain.ALLOWANCE:
+            owner, spender = map(
+                to_checksum_address, decode(["address", "address"], args)
+            )
+            return encode(["uint256"], [self.allowances.get((owner, spender), 0)])
+        if target == CTF and selector == onchain.IS_APPROVED_FOR_ALL:
+            owner, operator = map(
+                to_checksum_address, decode(["address", "address"], args)
+            )
+            return encode(["bool"], [(owner, operator) in self.approvals])
+        if target == CTF and selector == onchain.BALANCE_OF_BATCH:
+            owners, token_ids = decode(["address[]", "uint256[]"], args)
+            balances = [
+                self.positions.get((to_checksum_address(o), t), 0)
+                for o, t in zip(owners, token_ids)
+            ]
+            return encode(["uint256[]"], [balances])
+        raise LookupError(f"no function {selector.hex()} on {target}")
+
+
+class ChainReaderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.saved_client = transport._client
+        self.chain = FakeChain()
+        self.chain.usdc_balances[WALLET] = 1_234_500_000
+        self.chain.allowances[(WALLET, EXCHANGE)] = 2**256 - 1
+        self.chain.approvals.add((WALLET, EXCHANGE))
+        self.chain.positions[(WALLET, 111)] = 5_000_000
+        self.chain.positions[(WALLET, 222)] = 250_000
+        transport._client = httpx.Client(transport=httpx.MockTransport(self.chain))
+        self.web3 = Web3(RpcPoolProvider(["http://node/"]))
+
+    def tearDown(self):
+        transport._client.close()
+        transport._client = self.saved_client
+
+    def reader(self, multicall_address=MULTICALL):
+        return ChainReader(
+            self.web3, USDC, CTF, multicall_address=multicall_address, block_time=0
+        )
+
+    def eth_calls(self):
+        return self.chain.methods.count("eth_call")
+
+    def assert_snapshot(self, snapshot):
+        self.assertEqual(snapshot.block_number, 100)
+        self.assertEqual(snapshot.usdc_balance, 1234.5)
+        self.assertEqual(snapshot.allowances, {EXCHANGE: 2**256 - 1, ADAPTER: 0})
+        self.assertEqual(snapshot.ctf_approvals, {EXCHANGE: True, ADAPTER: False})
+        self.assertEqual(snapshot.positions, {"111": 5.0, "222": 0.25, "333": 0.0})
+
+
+class TestWalletSnapshot(ChainReaderTestCase):
+    def test_decodes_one_aggregate3_call(self):
+        snapshot = self.reader().wallet_snapshot(
+            WALLET, [EXCHANGE, ADAPTER], ["111", "222", "333"]
+        )
+        self.assert_snapshot(snapshot)
+        self.assertEqual(self.eth_calls(), 1)
+
+    def test_cached_within_one_block(self):
+        reader = self.reader()
+        first = reader.wallet_snapshot(WALLET, [EXCHANGE], ["111"])
+        second = reader.wallet_snapshot(WALLET, [EXCHANGE], ["111"])
+        self.assertIs(first, second)
+        self.assertEqual(reader.hits, 1)
+        self.assertEqual(self.eth_calls(), 1)
+        # the block number is re-read, so a new block is noticed
+        self.assertEqual(self.chain.methods.count("eth_blockNumber"), 2)
+
+    def test_new_block_reads_again(self):
+        reader = self.reader()
+        reader.wallet_snapshot(WALLET, [EXCHANGE], ["111"])
+        self.chain.block = 101
+        self.chain.usdc_balances[WALLET] = 0
+        snapshot = reader.wallet_snapshot(WALLET, [EXCHANGE], ["111"])
+        self.assertEqual(snapshot.block_number, 101)
+        self.assertEqual(snapshot.usdc_balance, 0.0)
+        self.assertEqual(self.eth_calls(), 2)
+
+    def test_without_multicall_issues_one_call_per_read(self):
+        snapshot = self.reader(multicall_address=None).wallet_snapshot(
+            WALLET, [EXCHANGE, ADAPTER], ["111", "222", "333"]
+        )
+        self.assert_snapshot(snapshot)
+        # balance, two reads per spender, one balanceOfBatch
+        self.assertEqual(self.eth_calls(), 6)
+
+    def test_failed_read_raises(self):
+        for multicall_address in (MULTICALL, None):
+            with self.subTest(multicall=multicall_address is not None):
+                reader = ChainReader(
+                    self.web3, USDC, WALLET, multicall_address, block_time=0
+                )
+                with self.assertRaises(RuntimeError):
+                    reader.wallet_snapshot(WALLET, [EXCHANGE])
+
+
+if __name__ == "__main__":
+    unittest.main()
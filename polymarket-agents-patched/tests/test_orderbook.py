@@ -0,0 +1,145 @@
+import threading
+import time
+import unittest
+
+from agents.polymarket.orderbook import OrderBookMirror
+
+
+def book_event(asset_id, bid, ask):
+    return {
+        "event_type": "book",
+        "asset_id": asset_id,
+        "bids": [{"price": bid, "size": "10"}],
+        "asks": [{"price": ask, "size": "10"}],
+        "timestamp": "1700000000000",
+    }
+
+
+class FakeFeed:
+    """
+    Opens when ``allow_open`` is set; ``drop()`` fails the connection. Like
+    ``ClobMarketFeed``, ``close()`` only has an effect once connected.
+    """
+
+    def __init__(self):
+        self.allow_open = threading.Event()
+        self.ended = threading.Event()
+        self.dropped = False
+        self.connected = False
+        self.connecting = None  # called after subscribing, before the socket opens
+        self.subscriptions = []
+        self.heartbeat = None
+
+    def run(self, token_ids, on_message, on_open=None, on_heartbeat=None):
+        if not self.allow_open.wait(1):
+            raise ConnectionError("could not connect")
+        self.subscriptions.append(list(token_ids))
+        if self.connecting is not None:
+            self.connecting()
+        self.heartbeat = on_heartbeat
+        self.connected = True
+        on_open()
+        for token_id in token_ids:
+            on_message(book_event(token_id, "0.40", "0.60"))
+        self.ended.wait()
+        self.ended.clear()
+        self.connected = False
+        if self.dropped:
+            self.dropped = False
+            raise ConnectionError("connection lost")
+
+    def drop(self):
+        self.dropped = True
+        self.ended.set()
+
+    def close(self):
+        if self.connected:
+            self.ended.set()
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestOrderBookMirror(unittest.TestCase):
+    def setUp(self):
+        self.feed = FakeFeed()
+        self.polled = []
+
+        def fetch_books(token_ids):
+            self.polled.append(list(token_ids))
+            return [
+                {
+                    "asset_id": token_id,
+                    "bids": [{"price": "0.30", "size": "1"}],
+                    "asks": [{"price": "0.50", "size": "1"}],
+                }
+                for token_id in token_ids
+            ]
+
+        self.mirror = OrderBookMirror(
+            ["A", "B"], feed=self.feed, fetch_books=fetch_books, poll_interval=0.02
+        )
+
+    def tearDown(self):
+        self.mirror.stop(timeout=1)
+
+    def test_not_connected_until_feed_opens(self):
+        self.mirror.start()
+        time.sleep(0.05)
+        self.assertFalse(self.mirror.feed_connected)
+        self.feed.allow_open.set()
+        self.assertTrue(wait_until(lambda: self.mirror.feed_connected))
+        self.assertEqual(self.mirror.mid("A"), 0.5)
+        self.assertEqual(self.mirror.quote("A")["source"], "feed")
+
+    def test_falls_back_to_polling_when_feed_drops(self):
+        self.feed.allow_open.set()
+        self.mirror.start()
+        self.assertTrue(wait_until(lambda: self.mirror.feed_connected))
+        self.feed.drop()
+        self.assertTrue(wait_until(lambda: self.mirror.polls > 0))
+        self.assertFalse(self.mirror.feed_connected)
+        self.assertEqual(self.polled[0], ["A", "B"])
+        self.assertEqual(self.mirror.quote("B")["source"], "poll")
+        self.assertEqual(self.mirror.best_ask("B"), 0.5)
+
+    def test_token_tracked_while_connecting_is_subscribed(self):
+        self.feed.connecting = lambda: self.mirror.track(["C"])
+        self.feed.allow_open.set()
+        self.mirror.start()
+        self.assertTrue(wait_until(lambda: len(self.feed.subscriptions) >= 2))
+        self.feed.connecting = None
+        self.assertEqual(self.feed.subscriptions[0], ["A", "B"])
+        self.assertEqual(self.feed.subscriptions[1], ["A", "B", "C"])
+        self.assertTrue(wait_until(lambda: self.mirror.mid("C") == 0.5))
+        self.assertEqual(self.mirror.polls, 0)
+
+    def test_quiet_book_stays_fresh_while_feed_is_alive(self):
+        self.feed.allow_open.set()
+        self.mirror.start()
+        self.assertTrue(wait_until(lambda: self.mirror.feed_connected))
+        self.mirror.book("A").updated_at -= 60
+        # a message for another asset proves the connection is live
+        self.mirror.handle_message(book_event("B", "0.41", "0.59"))
+        self.assertTrue(self.mirror.is_fresh("A", max_age=5))
+
+        self.mirror.feed_alive_at -= 60
+        self.assertFalse(self.mirror.is_fresh("A", max_age=5))
+        self.feed.heartbeat()
+        self.assertTrue(self.mirror.is_fresh("A", max_age=5))
+
+    def test_book_ages_from_own_update_without_feed(self):
+        self.mirror.poll_once()
+        self.assertTrue(self.mirror.is_fresh("A", max_age=5))
+        self.mirror.book("A").updated_at -= 60
+        self.assertFalse(self.mirror.is_fresh("A", max_age=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import gc
+import json
+import os
+import tempfile
+import unittest
+import weakref
+
+from agents.polymarket import paper
+from agents.polymarket.paper import PaperBook, PaperTrader
+
+
+def book(asks=(), bids=()):
+    return {
+        "asks": [{"price": p, "size": s} for p, s in asks],
+        "bids": [{"price": p, "size": s} for p, s in bids],
+    }
+
+
+class TestPaperBook(unittest.TestCase):
+    def test_walks_levels_for_size(self):
+        ladder = PaperBook(book(asks=[(0.52, 10), (0.50, 10)]))
+        filled, notional, touch = ladder.match("BUY", size=15)
+        self.assertEqual(filled, 15)
+        self.assertAlmostEqual(notional, 10 * 0.50 + 5 * 0.52)
+        self.assertEqual(touch, 0.50)
+        self.assertEqual(ladder.asks, [[0.52, 5]])
+
+    def test_empty_level_does_not_end_the_walk(self):
+        ladder = PaperBook(book(asks=[(0.50, 0), (0.51, 10), (0.52, 0), (0.53, 10)]))
+        filled, notional, touch = ladder.match("BUY", size=15)
+        self.assertEqual(filled, 15)
+        self.assertAlmostEqual(notional, 10 * 0.51 + 5 * 0.53)
+        self.assertEqual(touch, 0.51)
+        self.assertEqual(ladder.asks, [[0.53, 5]])
+
+    def test_market_buy_by_amount_stops_at_limit(self):
+        ladder = PaperBook(book(asks=[(0.40, 0), (0.50, 10), (0.60, 10)]))
+        filled, notional, _ = ladder.match("BUY", limit_price=0.55, amount=20)
+        self.assertEqual(filled, 10)
+        self.assertAlmostEqual(notional, 5.0)
+
+    def test_dry_run_leaves_book_untouched(self):
+        ladder = PaperBook(book(bids=[(0.48, 10), (0.49, 0)]))
+        ladder.match("SELL", size=5, consume=False)
+        self.assertEqual(ladder.bids, [[0.49, 0], [0.48, 10]])
+
+
+class TestPaperTrader(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "paper.json")
+
+    def journal(self):
+        with open(self.path) as f:
+            return json.load(f)["trades"]
+
+    def test_fok_is_killed_without_consuming(self):
+        trader = PaperTrader({"t": book(asks=[(0.5, 4)])}, journal=False)
+        fill = trader.execute("t", "BUY", size=5, fok=True)
+        self.assertEqual(fill["status"], "killed")
+        self.assertEqual(trader.book("t").asks, [[0.5, 4]])
+
+    def test_close_flushes_and_unregisters(self):
+        trader = PaperTrader({"t": book(asks=[(0.5, 10)])}, journal_path=self.path)
+        trader.execute("t", "BUY", size=2)
+        self.assertIn(trader, paper._open_traders)
+        trader.close()
+        self.assertEqual(len(self.journal()), 1)
+        self.assertNotIn(trader, paper._open_traders)
+
+    def test_exit_hook_does_not_keep_traders_alive(self):
+        trader = PaperTrader({}, journal_path=self.path)
+        self.assertIn(trader, paper._open_traders)
+        ref = weakref.ref(trader)
+        del trader
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+if __name__ == "__main__":
+    unittest.main()
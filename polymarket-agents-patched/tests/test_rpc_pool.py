@@ -0,0 +1,129 @@
+import json
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+from agents.utils import rpc_pool, transport
+from agents.utils.rpc_pool import RpcPoolProvider
+
+
+class FakeNodes:
+    """httpx transport answering JSON-RPC per host: a result, an error or a status."""
+
+    def __init__(self, **behaviour):
+        self.behaviour = behaviour
+        self.calls = []
+
+    def __call__(self, request):
+        host = request.url.host
+        self.calls.append(host)
+        rpc = json.loads(request.content)
+        answer = self.behaviour[host]
+        if isinstance(answer, tuple):
+            delay, answer = answer
+            time.sleep(delay)
+        if isinstance(answer, int):
+            return httpx.Response(answer)
+        body = {"jsonrpc": "2.0", "id": rpc["id"]}
+        body.update(answer)
+        return httpx.Response(200, json=body)
+
+
+class RpcPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.saved_client = transport._client
+        # never let the runner-up lead a hedged read at random
+        patcher = mock.patch.object(rpc_pool.random, "random", return_value=1.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        transport._client.close()
+        transport._client = self.saved_client
+
+    def provider(self, **behaviour):
+        self.nodes = FakeNodes(**behaviour)
+        transport._client = httpx.Client(transport=httpx.MockTransport(self.nodes))
+        return RpcPoolProvider([f"http://{host}/" for host in behaviour])
+
+    def stats(self, provider):
+        return {e.url.split("/")[2]: e for e in provider.endpoints}
+
+
+class TestFailover(RpcPoolTestCase):
+    def test_http_error_fails_over_to_next_endpoint(self):
+        provider = self.provider(a=503, b={"result": "0x1"})
+        response = provider.make_request("eth_sendRawTransaction", ["0x00"])
+        self.assertEqual(response["result"], "0x1")
+        self.assertEqual(self.nodes.calls, ["a", "b"])
+        self.assertEqual(self.stats(provider)["a"].failures, 1)
+
+    def test_rpc_error_counts_as_failure(self):
+        provider = self.provider(
+            a={"error": {"code": -32005, "message": "rate limited"}},
+            b={"result": "0x2"},
+        )
+        response = provider.make_request("eth_sendRawTransaction", ["0x00"])
+        self.assertEqual(response["result"], "0x2")
+        self.assertEqual(self.stats(provider)["a"].failures, 1)
+
+    def test_execution_revert_is_returned_without_failover(self):
+        revert = {"code": 3, "message": "execution reverted"}
+        provider = self.provider(a={"error": revert}, b={"result": "0x2"})
+        response = provider.make_request("eth_sendRawTransaction", ["0x00"])
+        self.assertEqual(response["error"], revert)
+        self.assertEqual(self.nodes.calls, ["a"])
+        self.assertEqual(self.stats(provider)["a"].failures, 0)
+
+    def test_last_rpc_error_is_returned_when_every_endpoint_errors(self):
+        provider = self.provider(
+            a={"error": {"code": -32000, "message": "header not found"}},
+            b={"error": {"code": -32005, "message": "rate limited"}},
+        )
+        response = provider.make_request("eth_sendRawTransaction", ["0x00"])
+        self.assertEqual(response["error"]["message"], "rate limited")
+
+    def test_connection_error_when_every_endpoint_is_down(self):
+        provider = self.provider(a=502, b=500)
+        with self.assertRaises(ConnectionError):
+            provider.make_request("eth_sendRawTransaction", ["0x00"])
+
+
+class TestScoring(RpcPoolTestCase):
+    def test_faster_endpoint_ranks_first(self):
+        provider = self.provider(a={"result": "0x1"}, b={"result": "0x1"})
+        a, b = provider.endpoints
+        for _ in range(rpc_pool.MIN_SAMPLES):
+            a.record_success(0.2)
+            b.record_success(0.05)
+        self.assertEqual(provider.ranked(), [b, a])
+
+    def test_failed_endpoint_drops_behind_healthy_one(self):
+        provider = self.provider(a=500, b={"result": "0x1"})
+        provider.make_request("eth_sendRawTransaction", ["0x00"])
+        provider.make_request("eth_sendRawTransaction", ["0x00"])
+        self.assertEqual(self.nodes.calls, ["a", "b", "b"])
+
+    def test_failure_streak_benches_endpoint(self):
+        provider = self.provider(a={"result": "0x1"}, b={"result": "0x1"})
+        a, b = provider.endpoints
+        for _ in range(rpc_pool.MIN_SAMPLES):
+            a.record_success(0.05)
+            b.record_success(0.2)
+        for _ in range(rpc_pool.FAILURES_BEFORE_COOLDOWN):
+            a.record_failure()
+        self.assertFalse(a.healthy())
+        self.assertEqual(provider.ranked(), [b, a])
+
+    def test_slow_primary_is_hedged_to_runner_up(self):
+        provider = self.provider(a=(0.5, {"result": "0xa"}), b={"result": "0xb"})
+        with mock.patch.object(rpc_pool, "DEFAULT_HEDGE_DELAY_SECONDS", 0.05):
+            response = provider.make_request("eth_blockNumber", [])
+        self.assertEqual(response["result"], "0xb")
+        self.assertEqual(self.stats(provider)["b"].hedges_won, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from agents.polymarket.sync import MarketSync
+
+
+def market(market_id, updated_at):
+    return {"id": market_id, "updatedAt": updated_at, "active": True}
+
+
+class FakeGamma:
+    def __init__(self, pages, universe=()):
+        self.pages = pages
+        self.universe = list(universe)
+        self.calls = []
+
+    def get_markets(self, querystring_params, use_cache=True):
+        self.calls.append(("page", use_cache))
+        index = querystring_params["offset"] // querystring_params["limit"]
+        return self.pages[index] if index < len(self.pages) else []
+
+    def get_all_current_markets(self, limit=100, use_cache=True):
+        self.calls.append(("all", use_cache))
+        return list(self.universe)
+
+
+class TestMarketSync(unittest.TestCase):
+    def make_sync(self, gamma, max_pages=10):
+        path = os.path.join(tempfile.mkdtemp(), "markets.json")
+        sync = MarketSync(gamma=gamma, path=path, page_size=2, max_pages=max_pages)
+        sync.markets = {"1": market(1, "2026-01-01T00:00:00Z")}
+        sync.high_water_mark = "2026-01-01T00:00:00Z"
+        return sync
+
+    def test_delta_skips_markets_without_updated_at(self):
+        gamma = FakeGamma(
+            [
+                [market(2, "2026-01-03T00:00:00Z"), {"id": 9, "active": True}],
+                [market(3, "2026-01-02T00:00:00Z"), market(1, "2025-12-01T00:00:00Z")],
+            ]
+        )
+        sync = self.make_sync(gamma)
+        delta = sync.sync()
+        self.assertEqual([m["id"] for m in delta.added], [2, 3])
+        self.assertEqual(delta.high_water_mark, "2026-01-03T00:00:00Z")
+        self.assertEqual(gamma.calls, [("page", False), ("page", False)])
+
+    def test_truncated_delta_falls_back_to_full_sync(self):
+        newer = [market(i, "2026-02-01T00:00:00Z") for i in range(10, 20)]
+        gamma = FakeGamma(
+            [newer[i : i + 2] for i in range(0, 10, 2)],
+            universe=[
+                market(1, "2026-01-05T00:00:00Z"),
+                market(4, "2026-01-04T00:00:00Z"),
+            ],
+        )
+        sync = self.make_sync(gamma, max_pages=2)
+        delta = sync.sync()
+        self.assertEqual(gamma.calls[-1], ("all", False))
+        self.assertEqual([m["id"] for m in delta.added], [4])
+        self.assertEqual([m["id"] for m in delta.changed], [1])
+        self.assertEqual(delta.removed, [])
+        self.assertEqual(sorted(sync.markets), ["1", "4"])
+        self.assertEqual(sync.high_water_mark, "2026-01-05T00:00:00Z")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from agents.utils.trade_stream import MalformedTradeError, TradeParser, parse_trade
+
+ANSWER = """I believe the market is underpriced.
+
+```
+price:0.55,
+size:0.2,
+side:BUY,
+```
+"""
+
+
+def feed_in_chunks(text, size):
+    parser = TradeParser()
+    states = []
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+        states.append(parser.complete)
+    return parser, states
+
+
+class TestTradeParser(unittest.TestCase):
+    def test_parses_finished_answer(self):
+        trade = parse_trade(ANSWER)
+        self.assertEqual((trade.price, trade.size, trade.side), (0.55, 0.2, "BUY"))
+
+    def test_every_chunk_size_gives_the_same_trade(self):
+        for size in range(1, len(ANSWER) + 1):
+            with self.subTest(size=size):
+                parser, _ = feed_in_chunks(ANSWER, size)
+                parser.finish()
+                self.assertEqual(
+                    (parser.price, parser.size, parser.side), (0.55, 0.2, "BUY")
+                )
+
+    def test_value_split_mid_token_waits_for_delimiter(self):
+        parser = TradeParser()
+        parser.feed("price: 0.")
+        self.assertIsNone(parser.price)
+        parser.feed("55, size: 1")
+        self.assertEqual(parser.price, 0.55)
+        self.assertIsNone(parser.size)
+        parser.feed("0, side: SE")
+        self.assertEqual(parser.size, 10)
+        self.assertFalse(parser.feed("LL"))
+        self.assertIsNone(parser.side)
+        self.assertTrue(parser.feed("\n"))
+        self.assertEqual(parser.side, "SELL")
+
+    def test_side_word_continuing_past_buy_is_not_a_side(self):
+        parser = TradeParser()
+        parser.feed("price: 0.5, size: 1, side: BUY")
+        self.assertIsNone(parser.side)
+        parser.feed("ER")
+        self.assertFalse(parser.complete)
+
+    def test_side_at_end_of_stream_is_accepted_by_finish(self):
+        parser = TradeParser()
+        parser.feed("price: 0.5, size: 1, side: sell")
+        self.assertFalse(parser.complete)
+        self.assertEqual(parser.finish().side, "SELL")
+
+    def test_complete_only_after_last_delimiter(self):
+        _, states = feed_in_chunks(ANSWER, 1)
+        first_complete = states.index(True)
+        self.assertEqual(ANSWER[first_complete], ",")
+        self.assertEqual(ANSWER[first_complete - 3 : first_complete], "BUY")
+
+    def test_non_numeric_value_raises(self):
+        with self.assertRaises(MalformedTradeError):
+            TradeParser().feed("price: high,")
+
+    def test_long_preamble_without_fields_raises(self):
+        with self.assertRaises(MalformedTradeError):
+            TradeParser(max_preamble=20).feed("thinking " * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
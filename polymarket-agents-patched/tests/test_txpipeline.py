@@ -0,0 +1,110 @@
+import threading
+import unittest
+from types import SimpleNamespace
+
+from agents.polymarket.txpipeline import (
+    NonceManager,
+    PartialBroadcastError,
+    TxPipeline,
+)
+
+
+class FakeEth:
+    def __init__(self, pending=7, fail_on_send=None):
+        self.pending = pending
+        self.fail_on_send = fail_on_send
+        self.count_calls = 0
+        self.sent_nonces = []
+        self.account = self
+        self._lock = threading.Lock()
+
+    def get_transaction_count(self, address, block):
+        self.count_calls += 1
+        return self.pending
+
+    def sign_transaction(self, txn, private_key):
+        return SimpleNamespace(raw_transaction=txn["nonce"])
+
+    def send_raw_transaction(self, raw):
+        with self._lock:
+            if len(self.sent_nonces) == self.fail_on_send:
+                raise ConnectionError("node rejected transaction")
+            self.sent_nonces.append(raw)
+            # the node counts broadcast transactions as pending
+            self.pending = raw + 1
+        return b"hash-%d" % raw
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout):
+        return {"transactionHash": tx_hash, "status": 1}
+
+
+class FakeCall:
+    def build_transaction(self, params):
+        return dict(params)
+
+
+def make_pipeline(eth):
+    web3 = SimpleNamespace(eth=eth)
+    return TxPipeline(web3, "key", "0xabc", chain_id=137)
+
+
+class TestNonceManager(unittest.TestCase):
+    def test_allocates_sequentially_after_one_lookup(self):
+        eth = FakeEth(pending=7)
+        nonces = NonceManager(SimpleNamespace(eth=eth), "0xabc")
+        self.assertEqual([nonces.allocate() for _ in range(3)], [7, 8, 9])
+        self.assertEqual(eth.count_calls, 1)
+
+    def test_reset_resyncs_from_pending_count(self):
+        eth = FakeEth(pending=7)
+        nonces = NonceManager(SimpleNamespace(eth=eth), "0xabc")
+        nonces.allocate()
+        nonces.allocate()
+        eth.pending = 8
+        nonces.reset()
+        self.assertEqual(nonces.allocate(), 8)
+        self.assertEqual(eth.count_calls, 2)
+
+    def test_concurrent_allocations_are_unique(self):
+        nonces = NonceManager(SimpleNamespace(eth=FakeEth(pending=0)), "0xabc")
+        allocated = []
+
+        def worker():
+            for _ in range(100):
+                allocated.append(nonces.allocate())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(allocated), list(range(800)))
+
+
+class TestTxPipeline(unittest.TestCase):
+    def test_run_sends_back_to_back_and_waits(self):
+        eth = FakeEth(pending=3)
+        receipts = make_pipeline(eth).run([FakeCall() for _ in range(3)])
+        self.assertEqual(eth.sent_nonces, [3, 4, 5])
+        self.assertEqual(
+            [r["transactionHash"] for r in receipts], [b"hash-3", b"hash-4", b"hash-5"]
+        )
+
+    def test_partial_send_failure_reports_sent_transactions(self):
+        eth = FakeEth(pending=3, fail_on_send=2)
+        pipeline = make_pipeline(eth)
+        with self.assertRaises(PartialBroadcastError) as caught:
+            pipeline.run([FakeCall() for _ in range(4)])
+        error = caught.exception
+        self.assertEqual(error.tx_hashes, [b"hash-3", b"hash-4"])
+        self.assertEqual([r["status"] for r in error.receipts], [1, 1])
+        self.assertIsInstance(error.error, ConnectionError)
+
+        # the failed nonce 5 was never broadcast, so it is handed out again
+        eth.fail_on_send = None
+        pipeline.run([FakeCall()])
+        self.assertEqual(eth.sent_nonces, [3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
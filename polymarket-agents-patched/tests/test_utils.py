@@ -0,0 +1,42 @@
+import json
+import unittest
+
+from agents.utils.utils import iter_json_array
+
+
+def split_every(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestIterJsonArray(unittest.TestCase):
+    def test_whole_document(self):
+        self.assertEqual(
+            list(iter_json_array(['[{"id": 1}, {"id": 2}]'])), [{"id": 1}, {"id": 2}]
+        )
+
+    def test_number_split_at_decimal_point(self):
+        self.assertEqual(list(iter_json_array(["[1500.", "0, []]"])), [1500.0, []])
+
+    def test_number_split_before_exponent(self):
+        self.assertEqual(list(iter_json_array(["[1", "e3]"])), [1000.0])
+
+    def test_literal_split_across_chunks(self):
+        self.assertEqual(
+            list(iter_json_array(["[tr", "ue, nu", "ll, fal", "se]"])),
+            [True, None, False],
+        )
+
+    def test_every_chunk_boundary(self):
+        items = [1500.25, -3, 1e-7, "a,]b", True, None, {"k": [1, 2.5]}, [], 0]
+        text = json.dumps(items)
+        for size in range(1, len(text) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(split_every(text, size))), items)
+
+    def test_truncated_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(["[1, 2"]))
+
+
+if __name__ == "__main__":
+    unittest.main()